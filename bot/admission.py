@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+
+class BusyError(Exception):
+    """Raised when a job is shed instead of queued"""
+
+
+class AdmissionController:
+    """Runs heavy ScheduleManager work off the event loop in a bounded pool.
+
+    Each user has their own queue, and a job is handed to the executor only
+    when a worker is free, taking users in round-robin order, so one user's
+    backlog waits behind a single job from everyone else rather than in front
+    of it. A job is shed (BusyError) when the user already has
+    `per_user_limit` jobs queued or running, or when `max_pending` jobs are
+    waiting overall.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32, per_user_limit: int = 2,
+                 sample_size: int = 512):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.per_user_limit = per_user_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='schedule-worker')
+        self._lock = threading.Lock()
+        self._per_user: Dict[int, int] = {}
+        # user id -> jobs waiting for a worker; dict order is the round-robin order
+        self._waiting: "OrderedDict[int, Deque[tuple]]" = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._shed = 0
+        self._wait_samples = deque(maxlen=sample_size)  # seconds spent queued
+
+    def _release_slot(self, user_id: int):
+        remaining = self._per_user[user_id] - 1
+        if remaining:
+            self._per_user[user_id] = remaining
+        else:
+            del self._per_user[user_id]
+
+    def _dispatch(self):
+        """Fill free workers from the user queues, one job per user per turn (lock held)"""
+        while self._running < self.max_workers and self._waiting:
+            user_id, jobs = next(iter(self._waiting.items()))
+            submitted, job = jobs.popleft()
+            if jobs:
+                self._waiting.move_to_end(user_id)
+            else:
+                del self._waiting[user_id]
+            self._queued -= 1
+            self._running += 1
+            self._wait_samples.append(time.perf_counter() - submitted)
+            self._executor.submit(job)
+
+    async def run(self, user_id: int, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool, or raise BusyError if over capacity"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def deliver(result, error):
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+        def job():
+            result, error = None, None
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    # The slot is held until the work is really done, even if the caller went away
+                    self._release_slot(user_id)
+                    self._dispatch()
+            try:
+                loop.call_soon_threadsafe(deliver, result, error)
+            except RuntimeError:
+                pass  # event loop already closed
+
+        entry = (time.perf_counter(), job)
+        with self._lock:
+            if self._per_user.get(user_id, 0) >= self.per_user_limit or self._queued >= self.max_pending:
+                self._shed += 1
+                raise BusyError()
+            self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+            self._queued += 1
+            self._waiting.setdefault(user_id, deque()).append(entry)
+            self._dispatch()
+
+        try:
+            return await future
+        finally:
+            with self._lock:
+                jobs = self._waiting.get(user_id)
+                if jobs is not None and entry in jobs:
+                    # Caller was cancelled while queued; the job must not run later
+                    jobs.remove(entry)
+                    if not jobs:
+                        del self._waiting[user_id]
+                    self._queued -= 1
+                    self._release_slot(user_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput and queue wait percentiles (milliseconds)"""
+        with self._lock:
+            samples = sorted(self._wait_samples)
+            metrics = {
+                'queue_depth': self._queued,
+                'users_waiting': len(self._waiting),
+                'running': self._running,
+                'workers': self.max_workers,
+                'completed': self._completed,
+                'shed': self._shed,
+            }
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 2)
+
+        metrics['wait_ms'] = {'p50': percentile(0.50), 'p95': percentile(0.95), 'p99': percentile(0.99)}
+        return metrics
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,78 @@
+"""Micro-benchmark: quick-add parser vs the legacy strptime-based !add path.
+
+Usage: python bench_quick_add.py [--lines 10000] [--repeat 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from quick_add import classify, parse_quick_add
+from schedule_manager import ScheduleManager
+
+QUICK_LINES = [
+    "Gym tomorrow 7pm #gym for 1h",
+    '"Read chapter 4" fri 21:30 #study 45m',
+    "Dentist 2030-08-01 14:00",
+    "Standup mon 9:30am #work 15m",
+    "Groceries today 18:00 #personal",
+]
+
+LEGACY_ARGS = [
+    ("Gym", "2030-07-16", "19:00"),
+    ("Read chapter 4", "2030-07-19", "21:30"),
+    ("Dentist", "2030-08-01", "14:00"),
+    ("Standup", "2030-07-22", "09:30"),
+    ("Groceries", "2030-07-15", "18:00"),
+]
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    text = "\n".join(QUICK_LINES[i % len(QUICK_LINES)] for i in range(args.lines))
+    legacy = [LEGACY_ARGS[i % len(LEGACY_ARGS)] for i in range(args.lines)]
+    today = datetime.now().date()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = ScheduleManager(storage_path=os.path.join(tmp, 'bench.json'))
+
+        def run_legacy():
+            for _, date_str, time_str in legacy:
+                manager._parse_date(date_str)
+                manager._parse_time(time_str)
+
+        def run_quick_cold():
+            classify.cache_clear()
+            parse_quick_add(text, today)
+
+        def run_quick_warm():
+            parse_quick_add(text, today)
+
+        legacy_s = best_of(args.repeat, run_legacy)
+        cold_s = best_of(args.repeat, run_quick_cold)
+        run_quick_warm()
+        warm_s = best_of(args.repeat, run_quick_warm)
+
+    print(f"{args.lines} lines, best of {args.repeat}")
+    print(f"  strptime _parse_date/_parse_time : {args.lines / legacy_s:>12,.0f} lines/s")
+    print(f"  quick-add (cold memo)            : {args.lines / cold_s:>12,.0f} lines/s")
+    print(f"  quick-add (warm memo)            : {args.lines / warm_s:>12,.0f} lines/s")
+    print("  (quick-add lines also carry relative dates, categories and durations)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Multi-process consistency check for shared (sharded) schedule stores.
+
+Several worker processes hammer the same guild partitions concurrently, then
+every process and a fresh reader must agree on the exact set of tasks, with
+no lost writes and no duplicate ids.
+
+Usage: python check_shared_store.py [--workers 4] [--tasks 50]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from guild_store import GuildStoreRegistry
+
+GUILDS = [1, 2]
+
+
+def worker(data_dir: str, worker_id: int, tasks: int, barrier, results):
+    registry = GuildStoreRegistry(data_dir=data_dir, shared=True, legacy_path=os.path.join(data_dir, 'schedule_data.json'))
+    user_id = 1000 + worker_id
+    kept = []
+
+    barrier.wait()
+    for i in range(tasks):
+        store = registry.get(GUILDS[i % len(GUILDS)])
+        result = store.add_task(user_id, f"w{worker_id}-t{i}", date_str="2030-01-01", time_str="09:00")
+        assert result['success'], result
+        # Edit every third task, delete every fifth, so all mutation paths interleave
+        if i % 3 == 0:
+            store.edit_task(user_id, result['task_id'], new_title=f"w{worker_id}-t{i}-edited")
+        if i % 5 == 0:
+            store.delete_task(user_id, result['task_id'])
+        else:
+            kept.append(result['task_id'])
+
+    # Wait for everyone to finish, then check this process sees all peers' writes
+    barrier.wait()
+    time.sleep(0.2)
+    registry.bus.poll()
+    seen = sorted(t['id'] for g in GUILDS for uid in registry.get(g).user_ids()
+                  for t in registry.get(g)._get_user_tasks(uid))
+    registry.bus.close()
+    results.put((worker_id, kept, seen))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--tasks', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        barrier = multiprocessing.Barrier(args.workers)
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=worker, args=(data_dir, w, args.tasks, barrier, results))
+                 for w in range(args.workers)]
+        for p in procs:
+            p.start()
+        outcomes = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+        expected = sorted(task_id for _, kept, _ in outcomes for task_id in kept)
+        reader = GuildStoreRegistry(data_dir=data_dir, legacy_path=os.path.join(data_dir, 'schedule_data.json'))
+        on_disk = sorted(t['id'] for g in GUILDS for tasks in reader.get(g).tasks.values() for t in tasks)
+
+        failures = []
+        if len(set(expected)) != len(expected):
+            failures.append("duplicate task ids were allocated")
+        if on_disk != expected:
+            failures.append(f"disk has {len(on_disk)} tasks, expected {len(expected)}")
+        for worker_id, _, seen in outcomes:
+            if seen != expected:
+                failures.append(f"worker {worker_id} sees {len(seen)} tasks, expected {len(expected)}")
+
+    if failures:
+        print("❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+    print(f"✅ {args.workers} processes, {len(expected)} tasks: consistent, ids unique")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+import discord
+import os
+import shutil
+import threading
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from schedule_manager import ScheduleManager
+from shared_store import IdAllocator, InvalidationBus, file_lock, require_shared_mode
+from timezones import UserZones
+
+MAX_SELECT_OPTIONS = 25  # Discord limit per select menu
+
+
+class GuildStoreRegistry:
+    """One ScheduleManager per guild, loaded on first use.
+
+    Each partition has its own file, lock and cache budget; the registry lock
+    only guards the partition lookup, never a partition's reads or writes.
+
+    With `shared=True` several bot processes can use the same data_dir: writes
+    take a file lock, task ids come from a shared allocator, and processes
+    tell each other which partitions changed.
+
+    Users' time zones are kept once for all partitions (data_dir/timezones.json),
+    so a zone set in one server applies in every server and in DMs.
+
+    A pre-partition schedule_data.json that isn't mapped with legacy_guild_id
+    is copied into the first server partition created without a file of its
+    own, so upgrading never silently drops existing tasks. A marker file next
+    to it records the copy so it happens only once.
+    """
+
+    def __init__(self, data_dir: str = 'guilds', cache_budget: int = 64,
+                 legacy_guild_id: Optional[int] = None, legacy_path: str = 'schedule_data.json',
+                 shared: bool = False):
+        self.data_dir = data_dir
+        self.cache_budget = cache_budget
+        self.legacy_guild_id = legacy_guild_id
+        self.legacy_path = legacy_path
+        self.shared = shared
+        self._stores: Dict[Optional[int], ScheduleManager] = {}
+        self._stores_by_path: Dict[str, ScheduleManager] = {}
+        self._lock = threading.Lock()
+
+        self._migrated_marker = f"{legacy_path}.migrated"
+        self._adopt_legacy = (legacy_guild_id is None and os.path.exists(legacy_path)
+                              and not os.path.exists(self._migrated_marker))
+        if self._adopt_legacy:
+            print(f"⚠️ {legacy_path} is not mapped to a server (LEGACY_GUILD_ID is not set). "
+                  f"Its tasks will be copied into the first server that uses the bot; "
+                  f"set LEGACY_GUILD_ID to choose the server instead.")
+
+        self.id_allocator: Optional[IdAllocator] = None
+        self.bus: Optional[InvalidationBus] = None
+        if shared:
+            require_shared_mode()
+            os.makedirs(self.data_dir, exist_ok=True)
+            self.id_allocator = IdAllocator(os.path.join(self.data_dir, 'task_ids'))
+            self.bus = InvalidationBus(os.path.join(self.data_dir, 'run'), self._on_remote_change,
+                                       self._on_bus_overflow)
+        self.zones = UserZones(os.path.join(self.data_dir, 'timezones.json'), shared=shared,
+                               on_commit=self._on_commit if shared else None)
+
+    def _on_remote_change(self, path: str, user_id: int):
+        if path == os.path.abspath(self.zones.path):
+            self.zones.mark_stale()
+            return
+        store = self._stores_by_path.get(path)
+        if store is not None:
+            store.mark_stale()
+
+    def _on_bus_overflow(self):
+        self.zones.mark_stale()
+        for store in list(self._stores.values()):
+            store.mark_stale()
+
+    def _on_commit(self, path: str, user_id: int):
+        self.bus.publish(path, user_id)
+
+    def _path_for(self, guild_id: Optional[int]) -> str:
+        if guild_id is not None and guild_id == self.legacy_guild_id:
+            return self.legacy_path
+        name = 'dm' if guild_id is None else str(guild_id)
+        return os.path.join(self.data_dir, f"{name}.json")
+
+    def _migrate_legacy(self, guild_id: int, path: str):
+        """Copy the unmapped legacy file into a new guild partition (once, across processes)"""
+        with file_lock(self.legacy_path + '.lock') if self.shared else nullcontext():
+            self._adopt_legacy = False
+            if os.path.exists(self._migrated_marker) or os.path.exists(path):
+                return  # another process got there first
+            shutil.copy2(self.legacy_path, path)
+            with open(self._migrated_marker, 'w') as f:
+                f.write(f"{guild_id}\n")
+        print(f"📦 Copied {self.legacy_path} into server {guild_id} ({path}); "
+              f"the original is left untouched")
+
+    def get(self, guild_id: Optional[int]) -> ScheduleManager:
+        """Store for a guild (None for DMs), loading it on demand"""
+        store = self._stores.get(guild_id)
+        if store is not None:
+            return store
+
+        with self._lock:
+            store = self._stores.get(guild_id)
+            if store is None:
+                path = self._path_for(guild_id)
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                if self._adopt_legacy and guild_id is not None and not os.path.exists(path):
+                    self._migrate_legacy(guild_id, path)
+                store = ScheduleManager(
+                    storage_path=path,
+                    cache_budget=self.cache_budget,
+                    shared=self.shared,
+                    id_allocator=self.id_allocator,
+                    on_commit=self._on_commit if self.shared else None,
+                    zones=self.zones
+                )
+                if self.id_allocator is not None:
+                    self.id_allocator.reserve_above(store.next_task_id - 1)
+                self._stores_by_path[os.path.abspath(path)] = store
+                self._stores[guild_id] = store
+            return store
+
+    def set_timezone(self, user_id: int, tz_name: str) -> Dict[str, Any]:
+        """Set a user's zone in every server; each store shifts their tasks' local times on next use"""
+        try:
+            tz_name = self.zones.set(user_id, tz_name)
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
+        return {'success': True, 'timezone': tz_name}
+
+    def existing(self, guild_id: Optional[int]) -> Optional[ScheduleManager]:
+        """Store for a guild only if it is loaded or already has data on disk"""
+        store = self._stores.get(guild_id)
+        if store is not None or not os.path.exists(self._path_for(guild_id)):
+            return store
+        return self.get(guild_id)
+
+    def loaded(self) -> List[Optional[int]]:
+        """Guild ids whose partitions are currently in memory"""
+        return list(self._stores)
+
+
+class MemberIndex:
+    """Per-guild cache of "view another's schedule" options.
+
+    Entries are rebuilt when the guild's store changes (someone gains or loses
+    tasks) or when a member update invalidates them.
+    """
+
+    def __init__(self, registry: GuildStoreRegistry):
+        self.registry = registry
+        self._entries: Dict[int, Tuple[int, Tuple[discord.SelectOption, ...]]] = {}
+
+    def invalidate(self, guild_id: int):
+        self._entries.pop(guild_id, None)
+
+    def options(self, guild: discord.Guild) -> List[discord.SelectOption]:
+        store = self.registry.get(guild.id)
+        cached = self._entries.get(guild.id)
+        if cached is not None and cached[0] == store.version:
+            return list(cached[1])
+
+        options = []
+        for user_id in store.user_ids():
+            member = guild.get_member(user_id)
+            if member is None or member.bot:
+                continue
+            options.append(discord.SelectOption(label=member.display_name[:100], value=str(user_id)))
+
+        options.sort(key=lambda o: o.label.lower())
+        options = tuple(options[:MAX_SELECT_OPTIONS])
+        self._entries[guild.id] = (store.version, options)
+        return list(options)
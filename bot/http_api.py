@@ -0,0 +1,156 @@
+import asyncio
+import json
+from typing import Optional
+
+from aiohttp import web
+
+from admission import AdmissionController
+from guild_store import GuildStoreRegistry
+from insights import current_period_key, period_totals
+
+STREAM_CHUNK = 50  # tasks per write when streaming listings
+
+
+class ScheduleAPI:
+    """Read-only local HTTP/JSON view of the in-memory schedule stores.
+
+    Every response carries an ETag built from the user's mutation counter, so
+    pollers sending If-None-Match get a 304 without any rendering. Store calls
+    wait on partition (and in shared mode, file) locks, so handlers make them
+    in a worker thread and only stream the finished result on the event loop.
+    """
+
+    def __init__(self, registry: GuildStoreRegistry, host: str = '127.0.0.1', port: int = 8080,
+                 admission: Optional[AdmissionController] = None):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.admission = admission
+        self.app = web.Application()
+        self.app.add_routes([
+            web.get('/guilds/{guild_id}/users/{user_id}/upcoming', self.upcoming),
+            web.get('/guilds/{guild_id}/users/{user_id}/summary', self.summary),
+            web.get('/guilds/{guild_id}/tasks/{task_id}', self.task),
+            web.get('/metrics', self.metrics),
+        ])
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"Schedule API listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _off_loop(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _store(self, request: web.Request):
+        raw = request.match_info['guild_id']
+        try:
+            guild_id = None if raw == 'dm' else int(raw)
+        except ValueError:
+            raise web.HTTPBadRequest(text="guild_id must be a number or 'dm'")
+        # Never create a partition (and its files) for an id a client made up
+        store = await self._off_loop(self.registry.existing, guild_id)
+        if store is None:
+            raise web.HTTPNotFound(text=f"No schedules for guild {raw}.")
+        return store
+
+    def _int_param(self, request: web.Request, name: str) -> int:
+        try:
+            return int(request.match_info[name])
+        except ValueError:
+            raise web.HTTPBadRequest(text=f"{name} must be a number")
+
+    def _client_has(self, request: web.Request, etag: str) -> bool:
+        return etag in request.headers.get('If-None-Match', '')
+
+    def _check_etag(self, request: web.Request, etag: str):
+        """Raise 304 if the client already has this version"""
+        if self._client_has(request, etag):
+            raise web.HTTPNotModified(headers={'ETag': etag})
+
+    async def upcoming(self, request: web.Request) -> web.StreamResponse:
+        store = await self._store(request)
+        user_id = self._int_param(request, 'user_id')
+        try:
+            days = max(1, min(int(request.query.get('days', 5)), 366))
+        except ValueError:
+            raise web.HTTPBadRequest(text="days must be a number")
+
+        def snapshot():
+            """(etag, pre-encoded task chunks, or None if the client is current)"""
+            today = store.user_day(user_id).today_iso
+            etag = f'"{store.instance_id}-{store.get_user_version(user_id)}-{today}-{days}"'
+            if self._client_has(request, etag):
+                return etag, None
+            tasks = store.get_upcoming_tasks(user_id, days)
+            return etag, [",".join(json.dumps(task) for task in tasks[start:start + STREAM_CHUNK]).encode()
+                          for start in range(0, len(tasks), STREAM_CHUNK)]
+
+        etag, chunks = await self._off_loop(snapshot)
+        self._check_etag(request, etag)
+
+        response = web.StreamResponse(headers={'ETag': etag, 'Content-Type': 'application/json'})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        await response.write(f'{{"user_id": {user_id}, "days": {days}, "tasks": ['.encode())
+        for i, chunk in enumerate(chunks):
+            await response.write((b',' if i else b'') + chunk)
+        await response.write(b']}')
+        await response.write_eof()
+        return response
+
+    async def task(self, request: web.Request) -> web.Response:
+        store = await self._store(request)
+        task_id = self._int_param(request, 'task_id')
+
+        def snapshot():
+            entry = store.get_task(task_id)
+            if entry is None:
+                return None, None, None
+            return entry[0], entry[1], f'"{store.instance_id}-{store.get_user_version(entry[0])}"'
+
+        user_id, task, etag = await self._off_loop(snapshot)
+        if task is None:
+            raise web.HTTPNotFound(text=f"Task with ID {task_id} not found.")
+        self._check_etag(request, etag)
+        return web.json_response({'user_id': user_id, 'task': task}, headers={'ETag': etag})
+
+    async def summary(self, request: web.Request) -> web.Response:
+        store = await self._store(request)
+        user_id = self._int_param(request, 'user_id')
+
+        def snapshot():
+            today = store.user_day(user_id).today
+            etag = f'"{store.instance_id}-{store.get_user_version(user_id)}-{today}"'
+            if self._client_has(request, etag):
+                return etag, None
+
+            report = store.get_insights(user_id)
+            all_time = report['monthly_minutes'].sum(axis=0) if report['task_count'] else []
+            return etag, {
+                'user_id': user_id,
+                'task_count': report['task_count'],
+                'minutes_by_category': {
+                    'week': period_totals(report, 'week', current_period_key('week', today)),
+                    'month': period_totals(report, 'month', current_period_key('month', today)),
+                    'all_time': {cat: int(m) for cat, m in zip(report['categories'], all_time)},
+                },
+            }
+
+        etag, body = await self._off_loop(snapshot)
+        self._check_etag(request, etag)
+        return web.json_response(body, headers={'ETag': etag})
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        """Worker pool queue depth and wait times"""
+        if self.admission is None:
+            raise web.HTTPNotFound(text="Admission metrics are not enabled.")
+        return web.json_response({'admission': self.admission.metrics()})
@@ -0,0 +1,101 @@
+import numpy as np
+from datetime import date
+from typing import Dict, List, Any
+
+# Tasks without a duration count as a single one-hour slot, in insights and overlap checks alike
+DEFAULT_SLOT_MINUTES = 60
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class TaskColumns:
+    """Columnar (one array per field) projection of a user's task list"""
+
+    __slots__ = ("days", "minutes", "category_codes", "categories")
+
+    def __init__(self, days: np.ndarray, minutes: np.ndarray, category_codes: np.ndarray, categories: List[str]):
+        self.days = days                      # datetime64[D]
+        self.minutes = minutes                # scheduled minutes per task
+        self.category_codes = category_codes  # index into self.categories
+        self.categories = categories
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Dict]) -> "TaskColumns":
+        """Project task dicts into parallel NumPy arrays"""
+        days = np.array([t['date'] for t in tasks], dtype='datetime64[D]')
+        minutes = np.array([t.get('duration') or DEFAULT_SLOT_MINUTES for t in tasks], dtype=np.int64)
+        raw_categories = np.array([t.get('category', 'default') for t in tasks], dtype=object)
+
+        if len(tasks):
+            categories, codes = np.unique(raw_categories.astype(str), return_inverse=True)
+            categories = categories.tolist()
+        else:
+            categories, codes = [], np.zeros(0, dtype=np.int64)
+
+        return cls(days, minutes, codes.astype(np.int64), categories)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def weekdays(self) -> np.ndarray:
+        """Monday=0 ... Sunday=6 (1970-01-01 was a Thursday)"""
+        return (self.days.astype(np.int64) + 3) % 7
+
+    def week_starts(self) -> np.ndarray:
+        """Monday of the week each task falls in"""
+        return self.days - self.weekdays().astype('timedelta64[D]')
+
+    def months(self) -> np.ndarray:
+        return self.days.astype('datetime64[M]')
+
+
+def _group_minutes(keys: np.ndarray, codes: np.ndarray, minutes: np.ndarray, n_categories: int):
+    """Vectorized group-by: sum minutes per (key, category)"""
+    if len(keys) == 0:
+        return keys, np.zeros((0, n_categories), dtype=np.int64)
+
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    flat = inverse * n_categories + codes
+    totals = np.bincount(flat, weights=minutes, minlength=len(unique_keys) * n_categories)
+    return unique_keys, totals.reshape(len(unique_keys), n_categories).astype(np.int64)
+
+
+def compute_insights(tasks: List[Dict]) -> Dict[str, Any]:
+    """Weekly, monthly and weekday minute totals by category for one user"""
+    columns = TaskColumns.from_tasks(tasks)
+    n_categories = len(columns.categories)
+
+    months, monthly = _group_minutes(columns.months(), columns.category_codes, columns.minutes, n_categories)
+    weeks, weekly = _group_minutes(columns.week_starts(), columns.category_codes, columns.minutes, n_categories)
+
+    by_weekday = np.bincount(
+        columns.weekdays() * n_categories + columns.category_codes,
+        weights=columns.minutes,
+        minlength=7 * n_categories
+    ).reshape(7, n_categories).astype(np.int64) if n_categories else np.zeros((7, 0), dtype=np.int64)
+
+    return {
+        'task_count': len(columns),
+        'categories': columns.categories,
+        'months': [str(m) for m in months],           # 'YYYY-MM'
+        'monthly_minutes': monthly,
+        'weeks': [str(w) for w in weeks],             # 'YYYY-MM-DD' (Monday)
+        'weekly_minutes': weekly,
+        'weekday_minutes': by_weekday,
+    }
+
+
+def period_totals(report: Dict[str, Any], period: str, key: str) -> Dict[str, int]:
+    """Minutes per category for a single month ('YYYY-MM') or week ('YYYY-MM-DD')"""
+    keys = report['months'] if period == 'month' else report['weeks']
+    matrix = report['monthly_minutes'] if period == 'month' else report['weekly_minutes']
+    if key not in keys:
+        return {}
+    row = matrix[keys.index(key)]
+    return {cat: int(row[i]) for i, cat in enumerate(report['categories']) if row[i]}
+
+
+def current_period_key(period: str, today: date) -> str:
+    if period == 'month':
+        return today.strftime('%Y-%m')
+    return str(np.datetime64(today, 'D') - np.timedelta64(today.weekday(), 'D'))
@@ -0,0 +1,130 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ('start', 'end', 'key', 'priority', 'max_end', 'left', 'right')
+
+    def __init__(self, start: int, end: int, key: int):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = random.random()
+        self.max_end = end  # largest end in this subtree
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+    def update(self):
+        self.max_end = self.end
+        if self.left is not None and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+def _rotate_right(node: _Node) -> _Node:
+    top = node.left
+    node.left = top.right
+    top.right = node
+    node.update()
+    top.update()
+    return top
+
+
+def _rotate_left(node: _Node) -> _Node:
+    top = node.right
+    node.right = top.left
+    top.left = node
+    node.update()
+    top.update()
+    return top
+
+
+class IntervalTree:
+    """Half-open [start, end) intervals keyed by task id, kept in a treap.
+
+    Nodes are ordered by (start, key) and carry the largest end in their
+    subtree, so an overlap query only descends into subtrees that can still
+    hold a match: O(log n) to reach the first hit, plus one short path per
+    interval reported. Inserts and removals are O(log n) expected, which lets
+    the schedule maintain a tree per user instead of rebuilding it.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._spans: Dict[int, Tuple[int, int]] = {}  # key -> (start, end), to find a node by key
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._spans
+
+    def insert(self, start: int, end: int, key: int):
+        """Add an interval; an existing interval with the same key is replaced"""
+        if end <= start:
+            raise ValueError("Interval end must be after its start")
+        if key in self._spans:
+            self.remove(key)
+        self._spans[key] = (start, end)
+        self._root = self._insert(self._root, _Node(start, end, key))
+
+    def _insert(self, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if (new.start, new.key) < (node.start, node.key):
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return _rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return _rotate_left(node)
+        node.update()
+        return node
+
+    def remove(self, key: int) -> bool:
+        span = self._spans.pop(key, None)
+        if span is None:
+            return False
+        self._root = self._remove(self._root, span[0], key)
+        return True
+
+    def _remove(self, node: Optional[_Node], start: int, key: int) -> Optional[_Node]:
+        if node is None:
+            return None
+        if (start, key) < (node.start, node.key):
+            node.left = self._remove(node.left, start, key)
+        elif (start, key) > (node.start, node.key):
+            node.right = self._remove(node.right, start, key)
+        else:
+            # Rotate the node down until it has at most one child, then splice it out
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            if node.left.priority > node.right.priority:
+                node = _rotate_right(node)
+                node.right = self._remove(node.right, start, key)
+            else:
+                node = _rotate_left(node)
+                node.left = self._remove(node.left, start, key)
+        node.update()
+        return node
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        """Keys of intervals overlapping [start, end), ordered by start"""
+        found: List[int] = []
+        self._collect(self._root, start, end, found)
+        return found
+
+    def _collect(self, node: Optional[_Node], start: int, end: int, found: List[int]):
+        # Nothing in this subtree ends after the query starts
+        if node is None or node.max_end <= start:
+            return
+        self._collect(node.left, start, end, found)
+        if node.start >= end:
+            return  # this node and everything to its right start too late
+        if node.end > start:
+            found.append(node.key)
+        self._collect(node.right, start, end, found)
@@ -0,0 +1,99 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class LoopLagWatchdog:
+    """Continuously measures event loop scheduling lag.
+
+    A coroutine on the loop ticks every `interval` seconds and records how late
+    it woke up. A helper thread watches those ticks; when the loop has been
+    stuck for longer than `block_threshold`, it grabs the loop thread's current
+    stack so the blocking callback (e.g. a save inside a modal's on_submit)
+    can be identified afterwards.
+    """
+
+    def __init__(self, interval: float = 0.25, block_threshold: float = 0.2,
+                 window: int = 2400, max_reports: int = 20):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._lags = deque(maxlen=window)  # seconds late per tick (~10 minutes at defaults)
+        self.reports = deque(maxlen=max_reports)
+        self._last_tick = time.perf_counter()
+        self._captured_tick: Optional[float] = None
+        self._open_report: Optional[Dict[str, Any]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    async def run(self):
+        """Tick forever on the event loop (start with loop.create_task)"""
+        if self._running:
+            return
+        self._running = True
+        self._loop_thread_id = threading.get_ident()
+        threading.Thread(target=self._monitor, name='loop-watchdog', daemon=True).start()
+
+        while True:
+            self._last_tick = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - self._last_tick - self.interval
+            self._lags.append(max(lag, 0.0))
+
+            with self._lock:
+                if self._open_report is not None:
+                    # The stall is over: record how long it really lasted
+                    self._open_report['blocked_for'] = lag
+                    self._open_report = None
+
+    def _monitor(self):
+        poll = max(self.block_threshold / 4, 0.01)
+        while True:
+            time.sleep(poll)
+            tick = self._last_tick
+            stalled = time.perf_counter() - tick - self.interval
+            if stalled < self.block_threshold or self._captured_tick == tick:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            report = {
+                'at': datetime.now(),
+                'blocked_for': stalled,  # updated once the loop wakes up
+                'stack': traceback.format_stack(frame),
+            }
+            with self._lock:
+                self._captured_tick = tick
+                self._open_report = report
+                self.reports.append(report)
+
+    def percentiles(self) -> Dict[str, float]:
+        """Rolling lag percentiles in milliseconds"""
+        samples = sorted(self._lags)
+        if not samples:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0, 'samples': 0}
+
+        def pick(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99),
+                'max': round(samples[-1] * 1000, 1), 'samples': len(samples)}
+
+    def recent_reports(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.reports)
+
+    @staticmethod
+    def culprit(report: Dict[str, Any]) -> str:
+        """Innermost frame from the bot's own code, falling back to the innermost frame"""
+        frames = report['stack']
+        for entry in reversed(frames):
+            if 'site-packages' not in entry and '/lib/python' not in entry:
+                return entry.strip().splitlines()[0]
+        return frames[-1].strip().splitlines()[0] if frames else '<unknown>'
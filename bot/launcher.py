@@ -0,0 +1,41 @@
+"""Run the bot as several processes, each owning a slice of the shards.
+
+Usage: python launcher.py --processes 2 --shards 4
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+def shard_slices(shard_count: int, processes: int):
+    """Spread shard ids round-robin over processes"""
+    return [list(range(p, shard_count, processes)) for p in range(processes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Launch sharded schedule bot processes")
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--shards', type=int, default=2)
+    args = parser.parse_args()
+
+    if args.processes > args.shards:
+        parser.error("--processes cannot exceed --shards")
+
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    children = []
+    for shard_ids in shard_slices(args.shards, args.processes):
+        env = dict(os.environ, SHARD_COUNT=str(args.shards), SHARD_IDS=",".join(map(str, shard_ids)))
+        print(f"Starting shards {shard_ids}")
+        children.append(subprocess.Popen([sys.executable, main_path], env=env))
+
+    try:
+        for child in children:
+            child.wait()
+    except KeyboardInterrupt:
+        for child in children:
+            child.terminate()
+
+
+if __name__ == '__main__':
+    main()
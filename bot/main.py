@@ -1,17 +1,92 @@
 import discord
 from discord.ext import commands
 from discord import ui
-from datetime import datetime, timedelta
-from schedule_manager import ScheduleManager
+from datetime import datetime
+from schedule_manager import ScheduleManager, CATEGORY_STYLES
+from quick_add import parse_quick_add
+from guild_store import GuildStoreRegistry, MemberIndex
+from http_api import ScheduleAPI
+from admission import AdmissionController, BusyError
+from profiler import ProfilingSession
+from ui_templates import ComponentTemplates
+from lag_watchdog import LoopLagWatchdog
 import asyncio
+import io
+import os
 
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+intents.members = True  # needed to resolve member names for the per-guild user picker
+
+# Sharded deployment: launcher.py sets these for each process (see README)
+SHARD_COUNT = os.environ.get('SHARD_COUNT')
+SHARD_IDS = os.environ.get('SHARD_IDS')
+
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix='!',
+        intents=intents,
+        shard_count=int(SHARD_COUNT),
+        shard_ids=[int(i) for i in SHARD_IDS.split(',')] if SHARD_IDS else None
+    )
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
+
+# Guild-partitioned schedule stores (set LEGACY_GUILD_ID to keep using schedule_data.json in that server;
+# otherwise it is copied into the first server that uses the bot)
+# Shard processes share the stores on disk, so they coordinate writes and task ids
+LEGACY_GUILD_ID = None
+guild_stores = GuildStoreRegistry(legacy_guild_id=LEGACY_GUILD_ID, shared=bool(SHARD_COUNT))
+member_index = MemberIndex(guild_stores)
+
+def get_store(guild) -> ScheduleManager:
+    """Schedule store for a guild, or the DM partition when there is none"""
+    return guild_stores.get(guild.id if guild else None)
+
+# Heavy rendering/storage work runs in a bounded worker pool, off the event loop
+# (jobs go through profiling_session.run_profiled so !profile also sees the pool threads)
+admission = AdmissionController()
+BUSY_MESSAGE = "⏳ The bot is busy right now — please try again in a few seconds."
+
+async def run_deferred(interaction: discord.Interaction, fn, *args, **kwargs):
+    """Acknowledge the interaction right away, then run fn in the worker pool.
+
+    Returns None after replying with a busy message if the work was shed.
+    """
+    if not interaction.response.is_done():
+        await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        return await admission.run(interaction.user.id, profiling_session.run_profiled, fn, *args, **kwargs)
+    except BusyError:
+        await interaction.followup.send(content=BUSY_MESSAGE, ephemeral=True)
+        return None
+
+async def run_for_command(ctx, fn, *args, **kwargs):
+    """Text-command counterpart of run_deferred"""
+    try:
+        return await admission.run(ctx.author.id, profiling_session.run_profiled, fn, *args, **kwargs)
+    except BusyError:
+        await ctx.send(BUSY_MESSAGE)
+        return None
+
+# Optional read-only HTTP API for dashboards (served by the process owning shard 0)
+API_PORT = os.environ.get('SCHEDULE_API_PORT')
+schedule_api = None
+if API_PORT and (not SHARD_IDS or 0 in [int(i) for i in SHARD_IDS.split(',')]):
+    schedule_api = ScheduleAPI(guild_stores, port=int(API_PORT), admission=admission)
+
+# Admin profiling (idle unless started with !profile start)
+profiling_session = ProfilingSession()
+profiling_window_task = None
+PROFILE_MAX_SECONDS = 300
 
-# Initialize schedule manager
-schedule_manager = ScheduleManager()
+# Event loop lag watchdog (view with !lag)
+loop_watchdog = LoopLagWatchdog()
+
+# Prebuilt picker options and the shared (stateless) category view
+component_templates = ComponentTemplates()
+category_select_view = None
 
 class MainMenuView(ui.View):
     def __init__(self):
@@ -20,36 +95,54 @@ class MainMenuView(ui.View):
     @ui.button(label='📅 View Schedule', style=discord.ButtonStyle.primary, emoji='📅', custom_id='view_schedule')
     async def view_schedule(self, interaction: discord.Interaction, button: ui.Button):
         user_id = interaction.user.id
-        schedule_embed = schedule_manager.get_schedule_display(user_id)
-        await interaction.response.defer(ephemeral=True)
-        await interaction.followup.send(embed=schedule_embed, ephemeral=True)
+        schedule_embed = await run_deferred(interaction, get_store(interaction.guild).get_schedule_display, user_id)
+        if schedule_embed is not None:
+            await interaction.followup.send(embed=schedule_embed, ephemeral=True)
 
     
     @ui.button(label='➕ Add Task', style=discord.ButtonStyle.success, emoji='➕', custom_id='add_task')
     async def add_task(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.send_message(
             content="🗂️ Choose a category for your new task:",
-            view=CategorySelectView(),
+            view=category_select_view or CategorySelectView(),
             ephemeral=True
         )
     
     @ui.button(label='📋 List Tasks', style=discord.ButtonStyle.secondary, emoji='📋', custom_id='list_tasks')
     async def list_tasks(self, interaction: discord.Interaction, button: ui.Button):
         user_id = interaction.user.id
-        tasks_embed = schedule_manager.list_user_tasks(user_id)
+        store = get_store(interaction.guild)
+        rendered = await run_deferred(
+            interaction, lambda: (store.list_user_tasks(user_id), store.get_selectable_tasks(user_id))
+        )
+        if rendered is None:
+            return
+        tasks_embed, selectable = rendered
         
         # Add edit/delete buttons if user has tasks
-        if schedule_manager.get_user_task_count(user_id) > 0:
-            view = TaskManagementView(user_id)
-            await interaction.response.send_message(embed=tasks_embed, view=view, ephemeral=True)
+        if selectable:
+            view = TaskManagementView(store, user_id, selectable)
+            await interaction.followup.send(embed=tasks_embed, view=view, ephemeral=True)
         else:
-            await interaction.response.send_message(embed=tasks_embed, ephemeral=True)
+            await interaction.followup.send(embed=tasks_embed, ephemeral=True)
     
     @ui.button(label="📎 View Another's Schedule", style=discord.ButtonStyle.secondary, emoji="📎", custom_id="view_other_schedule")
     async def view_other_schedule(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message(
+        if interaction.guild is None:
+            await interaction.response.send_message(content="❌ This only works inside a server.", ephemeral=True)
+            return
+
+        # Building the options reads the store under its lock, so it runs in the pool like other reads
+        options = await run_deferred(interaction, member_index.options, interaction.guild)
+        if options is None:
+            return
+        if not options:
+            await interaction.followup.send(content="📭 Nobody in this server has a schedule yet.", ephemeral=True)
+            return
+
+        await interaction.followup.send(
             content="👤 Select a user:",
-            view=UserSelectView(),
+            view=UserSelectView(options),
             ephemeral=True
         )
 
@@ -94,18 +187,13 @@ class MainMenuView(ui.View):
         await interaction.response.send_message(embed=help_embed, ephemeral=True)
 
 class UserSelectView(ui.View):
-    def __init__(self):
+    def __init__(self, options):
         super().__init__(timeout=30)
-        self.add_item(ManualUserSelect())
+        self.add_item(ManualUserSelect(options))
 
 class ManualUserSelect(ui.Select):
-    def __init__(self):
-        # 👤 Hardcoded users: label = name, value = user_id
-        options = [
-            discord.SelectOption(label="Parteek", value="668521341749690420", emoji="🧑🏾‍💻"),
-            discord.SelectOption(label="Rain", value="760956176761356349", emoji="👱🏼‍♀️")
-        ]
-
+    def __init__(self, options):
+        # 👤 Options come from the guild's cached member index: label = name, value = user_id
         super().__init__(
             placeholder="Select a user...",
             options=options,
@@ -116,75 +204,58 @@ class ManualUserSelect(ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         selected_id = int(self.values[0])
-        embed = schedule_manager.get_schedule_display(selected_id)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        embed = await run_deferred(interaction, get_store(interaction.guild).get_schedule_display, selected_id)
+        if embed is not None:
+            await interaction.followup.send(embed=embed, ephemeral=True)
 
 
 class CategorySelectView(ui.View):
+    # Holds no per-user state, so one persistent instance is shared by every click
     def __init__(self):
-        super().__init__(timeout=60)
+        super().__init__(timeout=None)
 
-    @ui.button(label="💼 Work", style=discord.ButtonStyle.primary, custom_id="cat_work")
-    async def work(self, interaction: discord.Interaction, button: ui.Button):
+    async def _open_picker(self, interaction: discord.Interaction, category: str):
+        tz_name = get_store(interaction.guild).get_timezone(interaction.user.id)
         await interaction.response.send_message(
             content="Pick a date and time:",
-            view=DateTimePickerView(category="work"),
+            view=DateTimePickerView(category=category, tz_name=tz_name),
             ephemeral=True
         )
 
+    @ui.button(label="💼 Work", style=discord.ButtonStyle.primary, custom_id="cat_work")
+    async def work(self, interaction: discord.Interaction, button: ui.Button):
+        await self._open_picker(interaction, "work")
+
     @ui.button(label="📘 Study", style=discord.ButtonStyle.primary, custom_id="cat_study")
     async def study(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message(
-            content="Pick a date and time:",
-            view=DateTimePickerView(category="study"),
-            ephemeral=True
-        )
+        await self._open_picker(interaction, "study")
 
     @ui.button(label="💪 Gym", style=discord.ButtonStyle.success, custom_id="cat_gym")
     async def gym(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message(
-            content="Pick a date and time:",
-            view=DateTimePickerView(category="gym"),
-            ephemeral=True
-        )
+        await self._open_picker(interaction, "gym")
 
     @ui.button(label="🧘 Personal", style=discord.ButtonStyle.secondary, custom_id="cat_personal")
     async def personal(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message(
-            content="Pick a date and time:",
-            view=DateTimePickerView(category="personal"),
-            ephemeral=True
-        )
+        await self._open_picker(interaction, "personal")
 
     @ui.button(label="🛠️ Project", style=discord.ButtonStyle.danger, custom_id="cat_project")
     async def project(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message(
-            content="Pick a date and time:",
-            view=DateTimePickerView(category="project"),
-            ephemeral=True
-        )
+        await self._open_picker(interaction, "project")
 
     @ui.button(label="📝 Other", style=discord.ButtonStyle.secondary, custom_id="cat_other")
     async def other(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message(
-            content="Pick a date and time:",
-            view=DateTimePickerView(category="default"),
-            ephemeral=True
-        )
+        await self._open_picker(interaction, "default")
 
 class DateTimePickerView(ui.View):
-    def __init__(self, category):
+    def __init__(self, category, tz_name):
         super().__init__(timeout=60)
         self.category = category
         self.selected_date = None
         self.selected_time = None
 
-        today = datetime.now()
-        dates = [(today + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(20)]
-        times = [f"{h:02d}:00" for h in range(7, 24)] + ["00:00"]
-
-        self.add_item(DatePickerSelect(self, dates))
-        self.add_item(TimePickerSelect(self, times))
+        # Dates start at the user's local today, not the server's
+        self.add_item(DatePickerSelect(self, component_templates.date_options(tz_name)))
+        self.add_item(TimePickerSelect(self, component_templates.time_options()))
 
     @ui.button(label="Continue", style=discord.ButtonStyle.success, emoji="➡️")
     async def continue_button(self, interaction: discord.Interaction, button: ui.Button):
@@ -200,9 +271,9 @@ class DateTimePickerView(ui.View):
         )
 
 class TaskManagementView(ui.View):
-    def __init__(self, user_id: int):
+    def __init__(self, store: ScheduleManager, user_id: int, tasks):
         super().__init__(timeout=300)
-        self.add_item(TaskSelect(user_id))
+        self.add_item(TaskSelect(store, user_id, tasks))
     
     @ui.button(label='✏️ Edit Task', style=discord.ButtonStyle.primary, emoji='✏️', custom_id='edit_task_btn')
     async def edit_task(self, interaction: discord.Interaction, button: ui.Button):
@@ -215,20 +286,13 @@ class TaskManagementView(ui.View):
         await interaction.response.send_modal(modal)
 
 class TaskSelect(ui.Select):
-    def __init__(self, user_id: int):
+    def __init__(self, store: ScheduleManager, user_id: int, tasks):
+        # `tasks` comes from store.get_selectable_tasks, computed in the worker pool
         self.user_id = user_id
-        from datetime import datetime
-
-        now = datetime.now()
-        tasks = sorted(
-            [t for t in schedule_manager._get_user_tasks(user_id)
-             if datetime.strptime(f"{t['date']} {t['hour']}:{t['minute']}", "%Y-%m-%d %H:%M") >= now],
-            key=lambda t: f"{t['date']} {t['hour']:02}:{t['minute']:02}"
-        )
 
         options = []
         for t in tasks[:25]:  # Limit to 25 to avoid Discord API error
-            label = f"{t['date']} • {schedule_manager._format_time_display(t['hour'], t['minute'])} - {t.get('title', '[No Title]')[:80]}"
+            label = f"{t['date']} • {store._format_time_display(t['hour'], t['minute'])} - {t.get('title', '[No Title]')[:80]}"
             value = str(t['id'])
             options.append(discord.SelectOption(label=label, value=value))
 
@@ -250,7 +314,7 @@ class DatePickerSelect(ui.Select):
         self.parent_view = parent_view
         super().__init__(
             placeholder="📅 Choose a date",
-            options=[discord.SelectOption(label=o, value=o) for o in options],
+            options=options,
             custom_id="date_picker"
         )
 
@@ -263,7 +327,7 @@ class TimePickerSelect(ui.Select):
         self.parent_view = parent_view
         super().__init__(
             placeholder="⏰ Choose a time",
-            options=[discord.SelectOption(label=o, value=o) for o in options],
+            options=options,
             custom_id="time_picker"
         )
 
@@ -284,12 +348,23 @@ class EditOrDeleteTaskView(ui.View):
 
     @ui.button(label="🗑️ Delete", style=discord.ButtonStyle.danger)
     async def delete(self, interaction: discord.Interaction, button: ui.Button):
-        result = schedule_manager.delete_task(self.user_id, self.task_id)
+        result = await run_deferred(interaction, get_store(interaction.guild).delete_task, self.user_id, self.task_id)
+        if result is None:
+            return
         if result['success']:
             msg = f"✅ Task `{self.task_id}` deleted successfully."
         else:
             msg = f"❌ Error deleting task: {result['error']}"
-        await interaction.response.send_message(content=msg, ephemeral=True)
+        await interaction.followup.send(content=msg, ephemeral=True)
+
+def conflict_note(conflicts) -> str:
+    """Overlap warning lines for a task reply, or "" if nothing overlaps"""
+    if not conflicts:
+        return ""
+    lines = [f"• **{c['title'][:60]}** — `{c['date']} {c['time']}` (ID `{c['id']}`)" for c in conflicts[:10]]
+    if len(conflicts) > 10:
+        lines.append(f"…and {len(conflicts) - 10} more")
+    return "\n\n⚠️ **Overlaps with:**\n" + "\n".join(lines)
 
 class EditTaskByIDModal(ui.Modal, title='Edit Selected Task'):
     def __init__(self, user_id: int, task_id: int):
@@ -301,21 +376,27 @@ class EditTaskByIDModal(ui.Modal, title='Edit Selected Task'):
     new_description = ui.TextInput(label="New Description", required=False, max_length=200)
     new_date = ui.TextInput(label="New Date (YYYY-MM-DD)", required=False, max_length=10)
     new_time = ui.TextInput(label="New Time (HH:MM)", required=False, max_length=5)
+    new_duration = ui.TextInput(label="New Duration (e.g. 45 or 1h30, 0 clears)", required=False, max_length=8)
 
     async def on_submit(self, interaction: discord.Interaction):
-        result = schedule_manager.edit_task(
+        result = await run_deferred(
+            interaction,
+            get_store(interaction.guild).edit_task,
             user_id=self.user_id,
             task_id=self.task_id,
             new_title=self.new_title.value or None,
             new_description=self.new_description.value or None,
             new_date=self.new_date.value or None,
-            new_time=self.new_time.value or None
+            new_time=self.new_time.value or None,
+            new_duration=self.new_duration.value or None
         )
+        if result is None:
+            return
         if result['success']:
-            msg = f"✅ Task `{self.task_id}` updated successfully."
+            msg = f"✅ Task `{self.task_id}` updated successfully." + conflict_note(result['conflicts'])
         else:
             msg = f"❌ Error: {result['error']}"
-        await interaction.response.send_message(content=msg, ephemeral=True)
+        await interaction.followup.send(content=msg, ephemeral=True)
 
 class AddTaskModal(ui.Modal, title='Add New Task'):
     def __init__(self, category="default", preset_date="", preset_time=""):
@@ -328,28 +409,37 @@ class AddTaskModal(ui.Modal, title='Add New Task'):
         self.task_description = ui.TextInput(label='Task Description (optional)', style=discord.TextStyle.paragraph, required=False, max_length=200)
         self.date = ui.TextInput(label='Date (YYYY-MM-DD)', required=False, max_length=10, default=self.preset_date)
         self.time = ui.TextInput(label='Time (HH:MM)', required=False, max_length=5, default=self.preset_time)
+        self.duration = ui.TextInput(label='Duration (optional, e.g. 45 or 1h30)', required=False, max_length=8)
 
         self.add_item(self.task_title)
         self.add_item(self.task_description)
         self.add_item(self.date)
         self.add_item(self.time)
+        self.add_item(self.duration)
 
     async def on_submit(self, interaction: discord.Interaction):
         user_id = interaction.user.id
-        result = schedule_manager.add_task(
+        result = await run_deferred(
+            interaction,
+            get_store(interaction.guild).add_task,
             user_id=user_id,
             title=self.task_title.value,
             description=self.task_description.value or "",
             date_str=self.date.value or None,
             time_str=self.time.value or None,
-            category=self.category
+            category=self.category,
+            duration_str=self.duration.value or None
         )
+        if result is None:
+            return
 
         if result["success"]:
+            duration = f" for **{result['duration']} min**" if result['duration'] else ""
             embed = discord.Embed(
                 title="✅ Task Added",
-                description=f"**{self.task_title.value}** scheduled on **{result['date']} at {result['time']}**\nCategory: `{self.category}`",
-                color=discord.Color.green()
+                description=f"**{self.task_title.value}** scheduled on **{result['date']} at {result['time']}**{duration}\nCategory: `{self.category}`"
+                            + conflict_note(result['conflicts']),
+                color=discord.Color.green() if not result['conflicts'] else discord.Color.gold()
             )
         else:
             embed = discord.Embed(
@@ -358,7 +448,7 @@ class AddTaskModal(ui.Modal, title='Add New Task'):
                 color=discord.Color.red()
             )
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 class CategoryDropdown(ui.Select):
     def __init__(self):
@@ -440,12 +530,16 @@ class EditTaskModal(ui.Modal, title='Edit Task'):
         new_date = self.new_date.value if self.new_date.value else None
         new_time = self.new_time.value if self.new_time.value else None
         
-        result = schedule_manager.edit_task(user_id, task_id, new_title, new_desc, new_date, new_time)
+        result = await run_deferred(
+            interaction, get_store(interaction.guild).edit_task, user_id, task_id, new_title, new_desc, new_date, new_time
+        )
+        if result is None:
+            return
         
         if result['success']:
             embed = discord.Embed(
                 title="✅ Task Updated Successfully",
-                description=f"**Task ID:** {task_id}\n**Updated successfully!**",
+                description=f"**Task ID:** {task_id}\n**Updated successfully!**" + conflict_note(result['conflicts']),
                 color=discord.Color.blue()
             )
         else:
@@ -455,7 +549,7 @@ class EditTaskModal(ui.Modal, title='Edit Task'):
                 color=discord.Color.red()
             )
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 class DeleteTaskModal(ui.Modal, title='Delete Task'):
     def __init__(self):
@@ -482,7 +576,9 @@ class DeleteTaskModal(ui.Modal, title='Delete Task'):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        result = schedule_manager.delete_task(user_id, task_id)
+        result = await run_deferred(interaction, get_store(interaction.guild).delete_task, user_id, task_id)
+        if result is None:
+            return
         
         if result['success']:
             embed = discord.Embed(
@@ -497,13 +593,22 @@ class DeleteTaskModal(ui.Modal, title='Delete Task'):
                 color=discord.Color.red()
             )
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 @bot.event
 async def on_ready():
+    global category_select_view
     print(f'{bot.user} is online and ready.')
 
     bot.add_view(MainMenuView())
+    if category_select_view is None:
+        category_select_view = CategorySelectView()
+        bot.add_view(category_select_view)
+        bot.loop.create_task(loop_watchdog.run())
+        if guild_stores.bus is not None:
+            guild_stores.bus.attach(bot.loop)
+        if schedule_api is not None:
+            await schedule_api.start()
 
     # Send the !menu to a default channel (e.g., your channel ID)
     channel = bot.get_channel('CHANNEL_ID') #============================================= CHANNEL ID
@@ -533,6 +638,15 @@ async def menu_reminder():
             await channel.send(embed=embed, view=MainMenuView())
         await asyncio.sleep(6 * 60 * 60)  # 6 hours
 
+@bot.event
+async def on_member_update(before, after):
+    if before.display_name != after.display_name:
+        member_index.invalidate(after.guild.id)
+
+@bot.event
+async def on_member_remove(member):
+    member_index.invalidate(member.guild.id)
+
 # Keep the old commands for backward compatibility
 @bot.command(name='menu', help='Show the main menu')
 async def show_menu(ctx):
@@ -561,29 +675,94 @@ async def show_menu(ctx):
 async def show_schedule(ctx):
     """Display the schedule for the next 5 days from 7 AM to 12 AM"""
     user_id = ctx.author.id
-    schedule_embed = schedule_manager.get_schedule_display(user_id)
-    await ctx.send(embed=schedule_embed)
+    schedule_embed = await run_for_command(ctx, get_store(ctx.guild).get_schedule_display, user_id)
+    if schedule_embed is not None:
+        await ctx.send(embed=schedule_embed)
+
+@bot.command(name='insights', help='Show time scheduled per category. Usage: !insights [week|month]')
+async def show_insights(ctx, period: str = "month"):
+    """Display hours scheduled per category for the current week or month"""
+    period = period.lower()
+    if period not in ("week", "month"):
+        raise commands.BadArgument(f"Unknown period '{period}'")
+
+    insights_embed = await run_for_command(ctx, get_store(ctx.guild).get_insights_display, ctx.author.id, period)
+    if insights_embed is not None:
+        await ctx.send(embed=insights_embed)
+
+@bot.command(name='timezone', help='Show or set your time zone. Usage: !timezone [Area/City]')
+async def timezone_command(ctx, tz_name: str = None):
+    """Show the caller's zone, or set it and shift their tasks' local times to match"""
+    store = get_store(ctx.guild)
+    user_id = ctx.author.id
+
+    if tz_name is None:
+        day = store.user_day(user_id)
+        embed = discord.Embed(
+            title="🌍 Your Time Zone",
+            description=f"**{day.tz_name}** — today is {day.today.strftime('%A, %B %d')}.\n"
+                        f"Change it with `!timezone Area/City` (e.g. `!timezone Europe/London`).",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed)
+        return
+
+    result = await run_for_command(ctx, guild_stores.set_timezone, user_id, tz_name)
+    if result is None:
+        return
+    if result['success']:
+        embed = discord.Embed(
+            title="✅ Time Zone Updated",
+            description=f"Your time zone is now **{result['timezone']}**. Existing tasks were moved to your local times.",
+            color=discord.Color.green()
+        )
+    else:
+        embed = discord.Embed(
+            title="❌ Error Setting Time Zone",
+            description=result['error'],
+            color=discord.Color.red()
+        )
+    await ctx.send(embed=embed)
 
-@bot.command(name='add', help='Add a task to your schedule. Usage: !add "Task description" [date] [time]')
-async def add_task(ctx, task_description: str, date: str = None, time: str = None):
-    """Add a task to the schedule"""
+@bot.command(name='add', help='Quick-add tasks, one per line. Usage: !add Gym tomorrow 7pm #gym for 1h')
+async def add_task(ctx, *, text: str):
+    """Add one or more tasks; each line is a title plus optional date, time, #category and duration"""
     user_id = ctx.author.id
     
     try:
-        result = schedule_manager.add_task(user_id, title=task_description, description="", date_str=date, time_str=time)
+        tasks, errors = parse_quick_add(text, get_store(ctx.guild).user_day(user_id).today)
+        result = {'added': [], 'errors': [], 'conflicts': {}}
+        if tasks:
+            result = await run_for_command(ctx, get_store(ctx.guild).add_tasks, user_id, tasks)
+            if result is None:
+                return
+        errors = sorted(errors + result['errors'], key=lambda e: e[0] or 0)
         
-        if result['success']:
+        if result['added']:
+            lines = []
+            for task in result['added']:
+                emoji = CATEGORY_STYLES.get(task['category'], CATEGORY_STYLES["default"])["emoji"]
+                duration = f" • {task['duration']} min" if task.get('duration') else ""
+                overlaps = result['conflicts'].get(task['id'])
+                overlap = f" ⚠️ overlaps ID {', '.join(str(c['id']) for c in overlaps)}" if overlaps else ""
+                lines.append(f"{emoji} **{task['title'][:60]}** — `{task['date']} {task['time']}`{duration} (ID `{task['id']}`){overlap}")
             embed = discord.Embed(
-                title="✅ Task Added Successfully",
-                description=f"**Task:** {task_description}\n**Date:** {result['date']}\n**Time:** {result['time']}",
+                title=f"✅ Added {len(result['added'])} Task{'s' if len(result['added']) != 1 else ''}",
+                description="\n".join(lines)[:4000],
                 color=discord.Color.green()
             )
         else:
             embed = discord.Embed(
                 title="❌ Error Adding Task",
-                description=result['error'],
+                description="No tasks were added.",
                 color=discord.Color.red()
             )
+        if errors:
+            embed.add_field(
+                name="⚠️ Skipped Lines",
+                value="\n".join(f"Line {line}: {error}" for line, error in errors)[:1024],
+                inline=False
+            )
         
         await ctx.send(embed=embed)
     
@@ -595,6 +774,90 @@ async def add_task(ctx, task_description: str, date: str = None, time: str = Non
         )
         await ctx.send(embed=embed)
 
+# Admin profiling commands
+def _profile_report_file(report: str) -> discord.File:
+    return discord.File(io.BytesIO(report.encode()), filename=f"profile_{datetime.now():%Y%m%d_%H%M%S}.txt")
+
+async def _profile_window(channel, seconds: int):
+    """Stop the profiler automatically once the window elapses"""
+    global profiling_window_task
+    await asyncio.sleep(seconds)
+    profiling_window_task = None
+    report = profiling_session.stop()
+    await channel.send(content=f"⏱️ Profiling window of {seconds}s elapsed.", file=_profile_report_file(report))
+
+@bot.group(name='profile', help='Admin: profile the bot. Usage: !profile start [seconds] | !profile stop', invoke_without_command=True)
+@commands.guild_only()
+@commands.has_permissions(administrator=True)
+async def profile(ctx):
+    status = "🟢 running" if profiling_session.active else "⚪ idle"
+    await ctx.send(f"Profiler is {status}. Use `!profile start [seconds]` or `!profile stop`.")
+
+@profile.command(name='start')
+@commands.guild_only()
+@commands.has_permissions(administrator=True)
+async def profile_start(ctx, seconds: int = 60):
+    """Start a bounded cProfile + tracemalloc window"""
+    global profiling_window_task
+    if profiling_session.active:
+        await ctx.send("⚠️ A profiling session is already running. Use `!profile stop` first.")
+        return
+
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+    profiling_session.start()
+    profiling_window_task = bot.loop.create_task(_profile_window(ctx.channel, seconds))
+    await ctx.send(f"🔬 Profiling started for up to {seconds}s.")
+
+@profile.command(name='stop')
+@commands.guild_only()
+@commands.has_permissions(administrator=True)
+async def profile_stop(ctx):
+    """Stop profiling early and attach the report"""
+    global profiling_window_task
+    if not profiling_session.active:
+        await ctx.send("⚪ No profiling session is running.")
+        return
+
+    if profiling_window_task is not None:
+        profiling_window_task.cancel()
+        profiling_window_task = None
+    report = profiling_session.stop()
+    await ctx.send(content="🔬 Profiling stopped.", file=_profile_report_file(report))
+
+@bot.command(name='lag', help='Admin: show event loop lag and recent blocking callbacks')
+@commands.guild_only()
+@commands.has_permissions(administrator=True)
+async def show_lag(ctx):
+    """Rolling event loop lag percentiles and the last slow callbacks"""
+    stats = loop_watchdog.percentiles()
+    reports = loop_watchdog.recent_reports()
+
+    embed = discord.Embed(
+        title="🩺 Event Loop Lag",
+        description=f"Over the last {stats['samples']} ticks ({loop_watchdog.interval * 1000:.0f} ms apart)",
+        color=discord.Color.dark_teal()
+    )
+    embed.add_field(
+        name="📈 Lag",
+        value=f"p50 `{stats['p50']} ms` • p95 `{stats['p95']} ms` • p99 `{stats['p99']} ms` • max `{stats['max']} ms`",
+        inline=False
+    )
+
+    if reports:
+        lines = [
+            f"`{r['at']:%H:%M:%S}` blocked **{r['blocked_for'] * 1000:.0f} ms**\n> `{LoopLagWatchdog.culprit(r)[:150]}`"
+            for r in reports[-5:]
+        ]
+        embed.add_field(name="🐢 Recent Blocking Callbacks", value="\n".join(lines)[:1024], inline=False)
+        stacks = "\n\n".join(
+            f"=== {r['at']:%Y-%m-%d %H:%M:%S} blocked {r['blocked_for'] * 1000:.0f} ms ===\n" + "".join(r['stack'])
+            for r in reports
+        )
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(stacks.encode()), filename="slow_callbacks.txt"))
+    else:
+        embed.add_field(name="🐢 Recent Blocking Callbacks", value=f"✅ Nothing blocked longer than {loop_watchdog.block_threshold * 1000:.0f} ms", inline=False)
+        await ctx.send(embed=embed)
+
 # Error handling
 @bot.event
 async def on_command_error(ctx, error):
@@ -612,6 +875,13 @@ async def on_command_error(ctx, error):
             color=discord.Color.red()
         )
         await ctx.send(embed=embed)
+    elif isinstance(error, commands.CheckFailure):
+        embed = discord.Embed(
+            title="🔒 Not Allowed",
+            description="You don't have permission to use this command here.",
+            color=discord.Color.red()
+        )
+        await ctx.send(embed=embed)
     else:
         embed = discord.Embed(
             title="❌ An Error Occurred",
@@ -0,0 +1,123 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, List, Optional
+
+# Functions called out separately in the report: (filename fragment, function name)
+WATCHED_FUNCTIONS = [
+    ("schedule_manager.py", "get_schedule_display"),
+    ("schedule_manager.py", "list_user_tasks"),
+    ("schedule_manager.py", "_save_data"),
+    ("main.py", "__init__"),          # TaskSelect / picker views
+    ("discord/http.py", "request"),   # REST round trips
+    ("discord/gateway.py", "received_message"),
+]
+
+
+class ProfilingSession:
+    """Deterministic profile + allocation trace of the bot for a bounded window.
+
+    cProfile only sees the thread that enables it, so besides the event loop
+    thread, jobs handed to the worker pool are profiled through run_profiled
+    and merged into the report. Nothing is hooked while no session is
+    running, so there is no overhead when off.
+    """
+
+    def __init__(self, top_n: int = 25):
+        self.top_n = top_n
+        self._profiler: Optional[cProfile.Profile] = None
+        self._started_at: Optional[float] = None
+        self._owns_tracemalloc = False
+        self._worker_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._profiler is not None
+
+    def start(self):
+        """Begin profiling the calling (event loop) thread"""
+        if self.active:
+            raise RuntimeError("A profiling session is already running.")
+
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+
+        self._worker_profiles = []
+        self._profiler = cProfile.Profile()
+        self._started_at = time.perf_counter()
+        self._profiler.enable()
+
+    def run_profiled(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn, profiling the call if a session is running (for worker pool threads)"""
+        if not self.active:
+            return fn(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler, and it already sees every thread
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                if self.active:
+                    self._worker_profiles.append(profiler)
+
+    def stop(self) -> str:
+        """Stop profiling and return a plain-text report"""
+        if not self.active:
+            raise RuntimeError("No profiling session is running.")
+
+        with self._lock:
+            profiler, self._profiler = self._profiler, None
+            worker_profiles, self._worker_profiles = self._worker_profiles, []
+        profiler.disable()
+        elapsed = time.perf_counter() - self._started_at
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        if worker_profiles:
+            stats.add(*worker_profiles)
+        return self._format_report(stats, len(worker_profiles), snapshot, elapsed, current, peak)
+
+    def _format_report(self, stats: pstats.Stats, worker_calls: int, snapshot: tracemalloc.Snapshot,
+                       elapsed: float, current: int, peak: int) -> str:
+        out = io.StringIO()
+        out.write(f"Profiling window: {elapsed:.1f}s\n")
+        out.write(f"Worker pool jobs profiled: {worker_calls}\n")
+        out.write(f"Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n\n")
+
+        stats.stream = out
+
+        out.write("=== Watched functions ===\n")
+        out.write(f"{'calls':>8} {'tottime':>10} {'cumtime':>10}  function\n")
+        for (filename, lineno, funcname), (_, calls, tottime, cumtime, _) in sorted(
+                stats.stats.items(), key=lambda item: -item[1][3]):
+            normalized = filename.replace("\\", "/")
+            if any(fragment in normalized and funcname == name for fragment, name in WATCHED_FUNCTIONS):
+                out.write(f"{calls:>8} {tottime:>10.4f} {cumtime:>10.4f}  {funcname} ({normalized}:{lineno})\n")
+
+        out.write(f"\n=== Top {self.top_n} by cumulative time ===\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+
+        out.write(f"\n=== Top {self.top_n} by own time ===\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_n)
+
+        out.write(f"\n=== Top {self.top_n} allocation sites ===\n")
+        for stat in snapshot.statistics("lineno")[:self.top_n]:
+            out.write(f"{stat}\n")
+
+        return out.getvalue()
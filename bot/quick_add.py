@@ -0,0 +1,181 @@
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Quick-add syntax, one task per line (every part but the title is optional):
+#   Gym tomorrow 7pm #gym for 1h
+#   "Read chapter 4" fri 21:30 #study 45m
+#   Dentist 2025-08-01 14:00
+
+RELATIVE_DAYS = {'today': 0, 'tonight': 0, 'tod': 0, 'tomorrow': 1, 'tmr': 1, 'tmrw': 1}
+
+WEEKDAYS = {
+    'mon': 0, 'monday': 0,
+    'tue': 1, 'tues': 1, 'tuesday': 1,
+    'wed': 2, 'weds': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3,
+    'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5,
+    'sun': 6, 'sunday': 6,
+}
+
+CATEGORY_ALIASES = {
+    'work': 'work', 'study': 'study', 'gym': 'gym', 'personal': 'personal',
+    'project': 'project', 'other': 'default', 'default': 'default',
+}
+
+DEFAULT_TIME = (9, 0)  # same default as ScheduleManager.add_task
+
+_TOKEN_RE = re.compile(r"""
+    (?P<iso>\d{4}-\d{1,2}-\d{1,2})
+  | (?P<md>(?P<md_month>\d{1,2})/(?P<md_day>\d{1,2}))
+  | (?P<clock>(?P<clock_h>\d{1,2}):(?P<clock_m>\d{2})(?P<clock_ampm>am|pm)?)
+  | (?P<ampm>(?P<ampm_h>\d{1,2})(?P<ampm_suffix>am|pm))
+  | (?P<dur>(?P<dur_h>\d+(?:\.\d+)?)h(?:rs?|ours?)?(?:(?P<dur_hm>\d{1,2})m?)?
+           |(?P<dur_m>\d+)m(?:ins?)?)
+""", re.VERBOSE)
+
+_QUOTED_TITLE_RE = re.compile(r'\s*"([^"]*)"\s*(.*)$')
+
+
+def _to_24h(hour: int, minute: int, suffix: Optional[str]) -> Tuple[int, int]:
+    if suffix:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid time '{hour}{suffix}'")
+        hour = hour % 12 + (12 if suffix == 'pm' else 0)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid time '{hour:02d}:{minute:02d}'")
+    return hour, minute
+
+
+@lru_cache(maxsize=1024)
+def classify(token: str, today: date) -> Tuple[Optional[str], object]:
+    """(kind, value) for one lowercase token; memoized per day, so date words resolve once"""
+    if token in RELATIVE_DAYS:
+        return 'date', (today + timedelta(days=RELATIVE_DAYS[token])).isoformat()
+    if token in WEEKDAYS:
+        # Next occurrence, counting today
+        return 'date', (today + timedelta(days=(WEEKDAYS[token] - today.weekday()) % 7)).isoformat()
+    if token == 'noon':
+        return 'time', (12, 0)
+    if token == 'midnight':
+        return 'time', (0, 0)
+    if token in ('next', 'for', 'at', 'on'):
+        return token, None
+    if token.startswith('#') and len(token) > 1:
+        return 'category', CATEGORY_ALIASES.get(token[1:], token[1:])
+
+    m = _TOKEN_RE.fullmatch(token)
+    if m is None:
+        return None, None
+    if m.group('iso'):
+        year, month, day = (int(p) for p in m.group('iso').split('-'))
+        try:
+            return 'date', date(year, month, day).isoformat()
+        except ValueError:
+            raise ValueError(f"Invalid date '{token}'. Use YYYY-MM-DD format (e.g., 2024-12-25)")
+    if m.group('md'):
+        try:
+            candidate = date(today.year, int(m.group('md_month')), int(m.group('md_day')))
+        except ValueError:
+            raise ValueError(f"Invalid date '{token}'. Use MM/DD format (e.g., 12/25)")
+        if candidate < today:
+            candidate = candidate.replace(year=today.year + 1)
+        return 'date', candidate.isoformat()
+    if m.group('clock'):
+        return 'time', _to_24h(int(m.group('clock_h')), int(m.group('clock_m')), m.group('clock_ampm'))
+    if m.group('ampm'):
+        return 'time', _to_24h(int(m.group('ampm_h')), 0, m.group('ampm_suffix'))
+    return 'duration', _duration_minutes(m, token)
+
+
+def _duration_minutes(m: re.Match, token: str) -> int:
+    if m.group('dur_h'):
+        minutes = round(float(m.group('dur_h')) * 60) + int(m.group('dur_hm') or 0)
+    else:
+        minutes = int(m.group('dur_m'))
+    if minutes <= 0:
+        raise ValueError(f"Invalid duration '{token}'")
+    return minutes
+
+
+def parse_duration(text: str) -> int:
+    """'45', '45m', '1h30' or '1.5h' -> minutes"""
+    token = text.strip().lower()
+    if token.isdigit():
+        token += 'm'
+    m = _TOKEN_RE.fullmatch(token)
+    if m is None or not m.group('dur'):
+        raise ValueError(f"Invalid duration '{text}'. Use minutes (e.g., 45) or 1h30")
+    return _duration_minutes(m, text)
+
+
+def parse_line(line: str, today: date) -> Dict:
+    """One quick-add line -> {'title', 'date', 'hour', 'minute', 'category', 'duration'}"""
+    title_words: List[str] = []
+    quoted = _QUOTED_TITLE_RE.match(line)
+    if quoted:
+        title_words.append(quoted.group(1))
+        tokens = quoted.group(2).split()
+    else:
+        tokens = line.split()
+
+    task = {'date': None, 'time': None, 'category': None, 'duration': None}
+    pending_next = False
+
+    for i, token in enumerate(tokens):
+        kind, value = classify(token.lower(), today)
+
+        if kind in ('for', 'at', 'on'):
+            # Connector words are only swallowed when a value follows them
+            following = classify(tokens[i + 1].lower(), today)[0] if i + 1 < len(tokens) else None
+            if following in ('duration', 'time', 'date', 'next'):
+                continue
+            kind = None
+        elif kind == 'next':
+            following = classify(tokens[i + 1].lower(), today) if i + 1 < len(tokens) else (None, None)
+            if following[0] == 'date' and tokens[i + 1].lower() in WEEKDAYS:
+                pending_next = True
+                continue
+            kind = None
+
+        if kind is None:
+            title_words.append(token)
+            continue
+
+        if task[kind] is not None:
+            raise ValueError(f"More than one {kind} given ('{token}')")
+        if kind == 'date' and pending_next:
+            value = (date.fromisoformat(value) + timedelta(days=7)).isoformat()
+            pending_next = False
+        task[kind] = value
+
+    title = " ".join(title_words).strip()
+    if not title:
+        raise ValueError("Missing task title")
+
+    hour, minute = task['time'] or DEFAULT_TIME
+    return {
+        'title': title,
+        'date': task['date'] or today.isoformat(),
+        'hour': hour,
+        'minute': minute,
+        'category': task['category'] or 'default',
+        'duration': task['duration'],
+    }
+
+
+def parse_quick_add(text: str, today: date) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+    """Parse every non-empty line; returns (tasks, [(line number, error)])"""
+    tasks, errors = [], []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            task = parse_line(line, today)
+            task['line'] = line_no
+            tasks.append(task)
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+    return tasks, errors
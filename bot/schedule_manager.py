@@ -1,8 +1,21 @@
 import discord
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import json
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Any
 import os
+import threading
+
+from insights import DEFAULT_SLOT_MINUTES, compute_insights, period_totals, current_period_key, WEEKDAY_NAMES
+from interval_tree import IntervalTree
+from quick_add import parse_duration
+from shared_store import IdAllocator, file_lock, file_signature
+from snapshot_store import read_snapshot, write_snapshot
+from timezones import (DEFAULT_TIMEZONE, UserZones, ZoneDay, calendar, local_to_utc, utc_minutes, utc_now,
+                       utc_to_local)
+
+MAX_DURATION_MINUTES = 24 * 60
 
 CATEGORY_STYLES = {
     "work":      {"emoji": "💼", "color": "🟦"},
@@ -13,17 +26,88 @@ CATEGORY_STYLES = {
     "default":   {"emoji": "📝", "color": "⚪"},
 }
 
+def _locked(method):
+    """Serialize a mutating method on this store's own lock.
+
+    Shared stores also take the cross-process file lock and pick up other
+    processes' writes before mutating, then notify peers of changed users.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            if not self.shared:
+                return method(self, *args, **kwargs)
+
+            with file_lock(self.storage_path + '.lock'):
+                self._holding_file_lock = True
+                try:
+                    if self._stale or file_signature(self.storage_path) != self._signature:
+                        self._reload_from_disk()
+                    self._changed_users.clear()
+                    result = method(self, *args, **kwargs)
+                finally:
+                    self._holding_file_lock = False
+
+            if self.on_commit is not None:
+                for user_id in self._changed_users:
+                    self.on_commit(self.storage_path, user_id)
+            self._changed_users.clear()
+            return result
+    return wrapper
+
+def _read_locked(method):
+    """Hold this store's lock while reading, so worker-thread writes can't interleave"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class ScheduleManager:
-    def __init__(self, storage_path='schedule_data.json'):
+    def __init__(self, storage_path='schedule_data.json', cache_budget: int = 64, shared: bool = False,
+                 id_allocator: Optional[IdAllocator] = None, on_commit: Optional[Callable[[str, int], None]] = None,
+                 generations: int = 3, zones: Optional[UserZones] = None):
         self.storage_path = storage_path
+        self.generations = generations  # snapshot files kept: storage_path, .1, .2, ...
         self.tasks: Dict[int, List[Dict]] = {}
+        # Users' chosen zones, shared with the other servers' stores when run under a registry
+        self.zones = zones or UserZones()
+        self.timezones: Dict[int, str] = {}  # user id -> zone this store's local fields are rendered in
         self.next_task_id = 1
-        self._load_data()
+        self._lock = threading.RLock()
+        # task id -> (user id, task) for direct lookups
+        self._task_index: Dict[int, tuple] = {}
+        # Per-user sorted date keys for window queries, cached against the user's version
+        self._date_keys: Dict[int, tuple] = {}
+        # Per-user interval trees of task spans, built on first use and then kept in step by each mutation
+        self._trees: Dict[int, IntervalTree] = {}
+        # Distinguishes this in-memory instance so version counters are never reused across restarts
+        self.instance_id = os.urandom(4).hex()
+        # Multi-process mode: other processes may write the same file
+        self.shared = shared
+        self.id_allocator = id_allocator
+        self.on_commit = on_commit
+        self._signature = None
+        self._stale = False
+        self._holding_file_lock = False
+        self._changed_users = set()
+        # Per-user mutation counters; derived views are cached against these
+        self._versions: Dict[int, int] = {}
+        self.version = 0  # bumped on any mutation in this store
+        # LRU of computed insights, bounded per store so one busy store can't evict another's
+        self.cache_budget = cache_budget
+        self._insights_cache: "OrderedDict[int, tuple]" = OrderedDict()
+        if self.shared:
+            with file_lock(self.storage_path + '.lock'):
+                self._load_data()
+        else:
+            self._load_data()
 
     def _load_data(self):
-        if os.path.exists(self.storage_path):
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
+        # Newest generation whose header checksum verifies; older ones are fallbacks
+        snapshot = read_snapshot(self.storage_path, self.generations)
+        if snapshot is not None:
+            data, _ = snapshot
 
             raw_tasks = data.get("tasks", {})
             self.tasks = {}
@@ -34,25 +118,168 @@ class ScheduleManager:
                     self.tasks[user_id] = []
                 self.tasks[user_id].extend(task_list)  # merge if duplicates found
 
-            # Rebuild task ID counter from all tasks
-            all_ids = [task['id'] for tasks in self.tasks.values() for task in tasks]
-            self.next_task_id = max(all_ids, default=0) + 1
+            self.timezones = {int(k): v for k, v in data.get("timezones", {}).items()}
+            # Zones chosen before they were shared across servers
+            self.zones.adopt(self.timezones)
+
+            # Tasks saved before time zones existed only have wall-clock fields
+            for user_id, tasks in self.tasks.items():
+                tz_name = self.timezones.get(user_id, DEFAULT_TIMEZONE)
+                for task in tasks:
+                    if 'start_utc' not in task:
+                        task['start_utc'] = local_to_utc(task['date'], task['hour'], task['minute'], tz_name)
+
+            self._task_index = {
+                task['id']: (user_id, task) for user_id, tasks in self.tasks.items() for task in tasks
+            }
+            self._trees = {}
+
+            # Never below an existing id, even if the saved counter lagged (e.g. ids from a shared allocator)
+            self.next_task_id = max(data.get("next_task_id") or 1, max(self._task_index, default=0) + 1)
+
+        self._signature = file_signature(self.storage_path)
 
     def _save_data(self):
         # Convert keys to strings to ensure valid JSON keys
         serializable_tasks = {str(k): v for k, v in self.tasks.items()}
-        with open(self.storage_path, 'w') as f:
-            json.dump({
-                "tasks": serializable_tasks,
-                "next_task_id": self.next_task_id
-            }, f, indent=2)
+        write_snapshot(self.storage_path, {
+            "tasks": serializable_tasks,
+            "timezones": {str(k): v for k, v in self.timezones.items()},
+            "next_task_id": self.next_task_id
+        }, self.generations)
+        self._signature = file_signature(self.storage_path)
+
+    def _reload_from_disk(self):
+        """Pick up another process's writes, invalidating only users whose tasks changed"""
+        old_tasks = self.tasks
+        self._load_data()
+        for user_id in set(old_tasks) | set(self.tasks):
+            if old_tasks.get(user_id) != self.tasks.get(user_id):
+                self._touch_user(user_id)
+        self._stale = False
+
+    def mark_stale(self):
+        """Another process changed this store; reload before the next read"""
+        self._stale = True
+
+    def _refresh_if_stale(self):
+        if not self._stale:
+            return
+        with self._lock:
+            if not self._stale:
+                return
+            if self._holding_file_lock:
+                self._reload_from_disk()
+            else:
+                with file_lock(self.storage_path + '.lock'):
+                    self._reload_from_disk()
+
+    def _allocate_task_id(self) -> int:
+        if self.id_allocator is not None:
+            # Keep the saved counter in step so it still covers every id if the allocator file is lost
+            task_id = self.id_allocator.next_id()
+            self.next_task_id = max(self.next_task_id, task_id + 1)
+            return task_id
+
+        # 🛡️ Ensure the next_task_id isn't already used (safe guard)
+        existing_ids = {task['id'] for task_list in self.tasks.values() for task in task_list}
+        while self.next_task_id in existing_ids:
+            self.next_task_id += 1
+        task_id = self.next_task_id
+        self.next_task_id += 1
+        return task_id
+
+    def _touch_user(self, user_id: int):
+        """Record a mutation of a user's tasks, invalidating cached views"""
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self.version += 1
+        self._insights_cache.pop(user_id, None)
+        self._date_keys.pop(user_id, None)
+        if self.shared:
+            self._changed_users.add(user_id)
+
+    def get_user_version(self, user_id: int) -> int:
+        """Current mutation counter for a user's tasks, after picking up other processes' writes"""
+        self._refresh_if_stale()
+        with self._lock:
+            self._sync_zone(user_id)
+            return self._versions.get(user_id, 0)
+
+    @_read_locked
+    def user_ids(self) -> List[int]:
+        """Users that currently have tasks in this store"""
+        self._refresh_if_stale()
+        return [user_id for user_id, tasks in self.tasks.items() if tasks]
+
+    def get_timezone(self, user_id: int) -> str:
+        return self.zones.get(user_id)
+
+    def user_day(self, user_id: int) -> ZoneDay:
+        """The user's current local day and schedule windows (cached until their midnight)"""
+        return calendar.day(self.get_timezone(user_id))
+
+    def _sync_zone(self, user_id: int):
+        """Re-render a user's local task times if their zone changed since (lock held).
+
+        Tasks keep their instant on the UTC timeline; only date/time/hour/minute move.
+        """
+        tz_name = self.zones.get(user_id)
+        if self.timezones.get(user_id, DEFAULT_TIMEZONE) == tz_name:
+            return
+        self.timezones[user_id] = tz_name
+        user_tasks = self.tasks.get(user_id)
+        if user_tasks:
+            for task in user_tasks:
+                task['date'], task['hour'], task['minute'] = utc_to_local(task['start_utc'], tz_name)
+                task['time'] = f"{task['hour']:02d}:{task['minute']:02d}"
+            user_tasks.sort(key=lambda x: (x['date'], x['hour'], x['minute']))
+            self._touch_user(user_id)
 
     def _get_user_tasks(self, user_id: int) -> List[Dict]:
         """Get all tasks for a specific user"""
+        self._refresh_if_stale()
+        self._sync_zone(user_id)
         if user_id not in self.tasks:
             self.tasks[user_id] = []
         return self.tasks[user_id]
     
+    def _span(self, task: Dict) -> tuple:
+        """[start, end) in UTC minutes; tasks without a duration take the default one-hour slot"""
+        start = utc_minutes(task['start_utc'])
+        return start, start + (task.get('duration') or DEFAULT_SLOT_MINUTES)
+
+    def _tree(self, user_id: int) -> IntervalTree:
+        tree = self._trees.get(user_id)
+        if tree is None:
+            tree = IntervalTree()
+            for task in self._get_user_tasks(user_id):
+                tree.insert(*self._span(task), task['id'])
+            self._trees[user_id] = tree
+        return tree
+
+    def _update_span(self, user_id: int, task: Dict):
+        """Re-index a task's span in the user's tree, if that tree has been built"""
+        tree = self._trees.get(user_id)
+        if tree is not None:
+            tree.insert(*self._span(task), task['id'])
+
+    def _conflicts(self, user_id: int, task: Dict) -> List[Dict]:
+        """The user's other tasks overlapping `task`, soonest first"""
+        conflicts = []
+        for task_id in self._tree(user_id).overlapping(*self._span(task)):
+            entry = self._task_index.get(task_id)
+            if task_id != task['id'] and entry is not None:
+                other = entry[1]
+                conflicts.append({'id': other['id'], 'title': other['title'], 'date': other['date'], 'time': other['time']})
+        return conflicts
+
+    def _parse_duration(self, duration_str: str) -> int:
+        """Parse a duration in minutes (45) or hours and minutes (1h30)"""
+        minutes = parse_duration(duration_str)
+        if minutes > MAX_DURATION_MINUTES:
+            raise ValueError(f"Duration can be at most 24 hours. You entered {minutes} minutes.")
+        return minutes
+
     def _parse_date(self, date_str: str) -> datetime:
         """Parse date string in YYYY-MM-DD format"""
         try:
@@ -83,13 +310,15 @@ class ScheduleManager:
         else:
             return f"{hour-12}:{minute:02d} PM"
     
-    def add_task(self, user_id: int, title: str, description: str = "", date_str: str = None, time_str: str = None, category: str = "default") -> Dict[str, Any]:
+    @_locked
+    def add_task(self, user_id: int, title: str, description: str = "", date_str: str = None, time_str: str = None, category: str = "default",
+                 duration_str: str = None) -> Dict[str, Any]:
 
-        """Add a new task to the schedule"""
+        """Add a new task to the schedule, reporting any tasks it overlaps"""
         try:
             # Parse date (default to today if not provided)
             if date_str is None:
-                task_date = datetime.now()
+                task_date = self.user_day(user_id).today
             else:
                 task_date = self._parse_date(date_str)
 
@@ -99,6 +328,8 @@ class ScheduleManager:
             else:
                 hour, minute = self._parse_time(time_str)
 
+            duration = self._parse_duration(duration_str) if duration_str else None
+
             # Validate time range
             if not self._validate_time_range(hour):
                 return {
@@ -107,35 +338,18 @@ class ScheduleManager:
                 }
 
             user_tasks = self._get_user_tasks(user_id)
-
-            # 🛡️ Ensure the next_task_id isn't already used (safe guard)
-            existing_ids = {task['id'] for task_list in self.tasks.values() for task in task_list}
-            while self.next_task_id in existing_ids:
-                self.next_task_id += 1
-
-            # Create task
-            task = {
-                'id': self.next_task_id,
-                'title': title,
-                'description': description,
-                'date': task_date.strftime('%Y-%m-%d'),
-                'time': f"{hour:02d}:{minute:02d}",
-                'hour': hour,
-                'minute': minute,
-                "category": category.lower(),
-                'created_at': datetime.now().isoformat()
-            }
-
-            user_tasks.append(task)
+            task = self._new_task(user_id, title, description, task_date.strftime('%Y-%m-%d'), hour, minute, category, duration)
             user_tasks.sort(key=lambda x: (x['date'], x['hour'], x['minute']))
-            self.next_task_id += 1
+            self._touch_user(user_id)
             self._save_data()
 
             return {
                 'success': True,
                 'task_id': task['id'],
                 'date': task['date'],
-                'time': task['time']
+                'time': task['time'],
+                'duration': duration,
+                'conflicts': self._conflicts(user_id, task)
             }
 
         except ValueError as e:
@@ -144,61 +358,121 @@ class ScheduleManager:
                 'error': str(e)
             }
 
+    def _new_task(self, user_id: int, title: str, description: str, date_str: str, hour: int, minute: int,
+                  category: str, duration: Optional[int] = None) -> Dict:
+        """Create and index a task (caller sorts, touches and saves)"""
+        user_tasks = self._get_user_tasks(user_id)  # renders the user's tasks in their current zone first
+        task = {
+            'id': self._allocate_task_id(),
+            'title': title,
+            'description': description,
+            'date': date_str,
+            'time': f"{hour:02d}:{minute:02d}",
+            'hour': hour,
+            'minute': minute,
+            "category": category.lower(),
+            'start_utc': local_to_utc(date_str, hour, minute, self.timezones.get(user_id, DEFAULT_TIMEZONE)),
+            'created_at': datetime.now().isoformat()
+        }
+        if duration:
+            task['duration'] = duration
+
+        user_tasks.append(task)
+        self._task_index[task['id']] = (user_id, task)
+        self._update_span(user_id, task)
+        return task
+
+    @_locked
+    def add_tasks(self, user_id: int, tasks: List[Dict]) -> Dict[str, Any]:
+        """Add several already-parsed tasks (see quick_add.parse_line) with a single save"""
+        added, errors = [], []
+        for spec in tasks:
+            if not self._validate_time_range(spec['hour']):
+                errors.append((spec.get('line'), f"Time must be between 7:00 AM and 12:00 AM (midnight). You entered {self._format_time_display(spec['hour'], spec['minute'])}."))
+                continue
+            if (spec.get('duration') or 0) > MAX_DURATION_MINUTES:
+                errors.append((spec.get('line'), f"Duration can be at most 24 hours. You entered {spec['duration']} minutes."))
+                continue
+            task = self._new_task(user_id, spec['title'], spec.get('description', ""), spec['date'],
+                                  spec['hour'], spec['minute'], spec.get('category', "default"), spec.get('duration'))
+            added.append(task)
+
+        if added:
+            self._get_user_tasks(user_id).sort(key=lambda x: (x['date'], x['hour'], x['minute']))
+            self._touch_user(user_id)
+            self._save_data()
+
+        # task id -> overlapping tasks, for the added tasks that overlap anything
+        conflicts = {}
+        for task in added:
+            overlaps = self._conflicts(user_id, task)
+            if overlaps:
+                conflicts[task['id']] = overlaps
+
+        return {
+            'success': bool(added),
+            'added': [dict(task) for task in added],
+            'errors': errors,
+            'conflicts': conflicts
+        }
+
+    @_locked
     def edit_task(self, user_id: int, task_id: int, new_title: Optional[str] = None,
               new_description: Optional[str] = None, new_date: Optional[str] = None,
-              new_time: Optional[str] = None) -> Dict[str, Any]:
-        """Edit an existing task"""
+              new_time: Optional[str] = None, new_duration: Optional[str] = None) -> Dict[str, Any]:
+        """Edit an existing task, reporting any tasks it now overlaps ("0" clears the duration)"""
         try:
             user_tasks = self._get_user_tasks(user_id)
             
             # Find the task
-            task_index = None
-            for i, task in enumerate(user_tasks):
-                if task['id'] == task_id:
-                    task_index = i
-                    break
-            
-            if task_index is None:
+            task = next((t for t in user_tasks if t['id'] == task_id), None)
+            if task is None:
                 return {
                     'success': False,
                     'error': f"Task with ID {task_id} not found."
                 }
-            
-            if new_title is not None:
-                task['title'] = new_title
 
-            task = user_tasks[task_index]
-            
-            # Update description if provided
-            if new_description is not None:
-                task['description'] = new_description
-            
-            # Update date if provided
-            if new_date is not None:
-                parsed_date = self._parse_date(new_date)
-                task['date'] = parsed_date.strftime('%Y-%m-%d')
-            
-            # Update time if provided
+            # Validate every field before touching the task, so a rejected edit changes nothing
+            date_str = self._parse_date(new_date).strftime('%Y-%m-%d') if new_date is not None else task['date']
             if new_time is not None:
                 hour, minute = self._parse_time(new_time)
-                
                 if not self._validate_time_range(hour):
                     return {
                         'success': False,
                         'error': f"Time must be between 7:00 AM and 12:00 AM (midnight). You entered {self._format_time_display(hour, minute)}."
                     }
-                
-                task['time'] = f"{hour:02d}:{minute:02d}"
-                task['hour'] = hour
-                task['minute'] = minute
+            else:
+                hour, minute = task['hour'], task['minute']
+            if new_duration is not None:
+                duration = 0 if new_duration.strip() == '0' else self._parse_duration(new_duration)
+            start_utc = local_to_utc(date_str, hour, minute, self.get_timezone(user_id))
+
+            if new_title is not None:
+                task['title'] = new_title
+            if new_description is not None:
+                task['description'] = new_description
+            task['date'] = date_str
+            task['time'] = f"{hour:02d}:{minute:02d}"
+            task['hour'] = hour
+            task['minute'] = minute
+            if new_duration is not None:
+                if duration:
+                    task['duration'] = duration
+                else:
+                    task.pop('duration', None)
+
+            task['start_utc'] = start_utc
+            self._update_span(user_id, task)
             
             # Re-sort tasks
             user_tasks.sort(key=lambda x: (x['date'], x['hour'], x['minute']))
+            self._touch_user(user_id)
             self._save_data()
 
             return {
                 'success': True,
-                'task_id': task_id
+                'task_id': task_id,
+                'conflicts': self._conflicts(user_id, task)
             }
             
         except ValueError as e:
@@ -207,6 +481,7 @@ class ScheduleManager:
                 'error': str(e)
             }
     
+    @_locked
     def delete_task(self, user_id: int, task_id: int) -> Dict[str, Any]:
         """Delete a task from the schedule"""
         user_tasks = self._get_user_tasks(user_id)
@@ -214,8 +489,13 @@ class ScheduleManager:
         for i, task in enumerate(user_tasks):
             if task['id'] == task_id:
                 deleted_task = user_tasks.pop(i)
+                self._task_index.pop(task_id, None)
+                if user_id in self._trees:
+                    self._trees[user_id].remove(task_id)
                 if not user_tasks:
                     del self.tasks[user_id]
+                    self._trees.pop(user_id, None)
+                self._touch_user(user_id)
                 self._save_data()  # ✅ Save after deletion
                 return {
                     'success': True,
@@ -227,11 +507,11 @@ class ScheduleManager:
             'error': f"Task with ID {task_id} not found."
         }
     
+    @_read_locked
     def get_schedule_display(self, user_id: int) -> discord.Embed:
         """Outlook-style horizontal schedule with stylized inline formatting."""
         user_tasks = self._get_user_tasks(user_id)
-        today = datetime.now()
-        dates = [(today + timedelta(days=i)) for i in range(5)]
+        window = self.user_day(user_id).window
 
         embed = discord.Embed(
             title="📅 Your Weekly Outlook",
@@ -240,9 +520,8 @@ class ScheduleManager:
 
         color_emojis = ['🟢', '🔵', '🟣', '🟡', '🟠', '🔴', '🟤']
 
-        for idx, date in enumerate(dates):
-            date_str = date.strftime('%Y-%m-%d')
-            display_date = f"📅 __**{date.strftime('%A, %B %d')}**__"
+        for idx, (date_str, date_label) in enumerate(window):
+            display_date = f"📅 __**{date_label}**__"
             day_tasks = [task for task in user_tasks if task['date'] == date_str]
             day_tasks.sort(key=lambda x: (x['hour'], x['minute']))
 
@@ -259,7 +538,8 @@ class ScheduleManager:
                     else:
                         desc_display = ''
 
-                    task_lines.append(f"{emoji} **{title}**\n`{time}`{desc_display}")
+                    duration = f" • {task['duration']} min" if task.get('duration') else ""
+                    task_lines.append(f"{emoji} **{title}**\n`{time}`{duration}{desc_display}")
                 value = "\n\n".join(task_lines)
             else:
                 value = "❌ *No tasks scheduled*"
@@ -269,16 +549,14 @@ class ScheduleManager:
         embed.set_footer(text="🧠 Use /menu or buttons to manage your tasks.")
         return embed
 
+    @_read_locked
     def list_user_tasks(self, user_id: int) -> discord.Embed:
         """List upcoming tasks for a user in clean chronological order"""
         user_tasks = self._get_user_tasks(user_id)
-        today = datetime.now().date()
+        today_iso = self.user_day(user_id).today_iso
 
-        # Filter out past tasks
-        future_tasks = [
-            task for task in user_tasks
-            if datetime.strptime(task['date'], '%Y-%m-%d').date() >= today
-        ]
+        # Filter out past tasks (ISO dates compare correctly as strings)
+        future_tasks = [task for task in user_tasks if task['date'] >= today_iso]
 
         future_tasks.sort(key=lambda x: (x['date'], x['hour'], x['minute']))
 
@@ -301,6 +579,8 @@ class ScheduleManager:
 
             # Format task display
             value = f"🕒 `{date_str} at {time_str}`\n**{title}**"
+            if task.get('duration'):
+                value += f" • {task['duration']} min"
             if description:
                 value += f"\n> {description[:100]}"
 
@@ -309,15 +589,123 @@ class ScheduleManager:
         embed.set_footer(text=f"Total upcoming tasks: {len(future_tasks)}")
         return embed
 
+    def get_insights(self, user_id: int) -> Dict[str, Any]:
+        """Category/weekday aggregates for a user, cached until their next mutation"""
+        self._refresh_if_stale()
+        with self._lock:
+            version = self.get_user_version(user_id)
+            cached = self._insights_cache.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._insights_cache.move_to_end(user_id)
+                return cached[1]
+
+            report = compute_insights(self.tasks.get(user_id, []))
+            self._insights_cache[user_id] = (version, report)
+            while len(self._insights_cache) > self.cache_budget:
+                self._insights_cache.popitem(last=False)
+            return report
+
+    def get_insights_display(self, user_id: int, period: str = "month") -> discord.Embed:
+        """Time scheduled per category for the current week or month"""
+        report = self.get_insights(user_id)
+        today = self.user_day(user_id).today
+        key = current_period_key(period, today)
+
+        embed = discord.Embed(
+            title=f"📊 Your {'Monthly' if period == 'month' else 'Weekly'} Insights",
+            color=discord.Color.purple()
+        )
+
+        if report['task_count'] == 0:
+            embed.description = "📭 You have no tasks to analyze yet!"
+            return embed
+
+        def format_hours(minutes: int) -> str:
+            return f"{minutes / 60:.1f}h"
+
+        def category_lines(totals: Dict[str, int]) -> str:
+            lines = []
+            for category, minutes in sorted(totals.items(), key=lambda kv: -kv[1]):
+                emoji = CATEGORY_STYLES.get(category, CATEGORY_STYLES["default"])["emoji"]
+                lines.append(f"{emoji} **{category.title()}** — `{format_hours(minutes)}`")
+            return "\n".join(lines) or "❌ *Nothing scheduled*"
+
+        label = today.strftime('%B %Y') if period == 'month' else f"Week of {key}"
+        embed.add_field(name=f"🗓️ {label}", value=category_lines(period_totals(report, period, key)), inline=False)
+
+        # Recent history: last few periods up to and including the current one
+        keys = report['months'] if period == 'month' else report['weeks']
+        matrix = report['monthly_minutes'] if period == 'month' else report['weekly_minutes']
+        recent = [(k, int(row.sum())) for k, row in zip(keys, matrix) if k <= key][-6:]
+        if recent:
+            embed.add_field(
+                name="📈 History",
+                value="\n".join(f"`{k}` — {format_hours(m)}" for k, m in recent),
+                inline=True
+            )
+
+        weekday_totals = report['weekday_minutes'].sum(axis=1)
+        embed.add_field(
+            name="📅 By Weekday (all time)",
+            value="\n".join(f"`{WEEKDAY_NAMES[i][:3]}` — {format_hours(int(m))}" for i, m in enumerate(weekday_totals)),
+            inline=True
+        )
+
+        embed.set_footer(text=f"Based on {report['task_count']} tasks • tasks without a duration count as one hour")
+        return embed
+
+    def get_task(self, task_id: int) -> Optional[tuple]:
+        """(user_id, task copy) for a task id, or None"""
+        self._refresh_if_stale()
+        with self._lock:
+            entry = self._task_index.get(task_id)
+            if entry is None:
+                return None
+            self._sync_zone(entry[0])
+            return entry[0], dict(entry[1])
+
+    def get_upcoming_tasks(self, user_id: int, days: int = 5) -> List[Dict]:
+        """Copies of a user's tasks dated from today through the next `days` days"""
+        self._refresh_if_stale()
+        with self._lock:
+            version = self.get_user_version(user_id)
+            user_tasks = self.tasks.get(user_id, [])
+            cached = self._date_keys.get(user_id)
+            if cached is None or cached[0] != version:
+                cached = (version, [task['date'] for task in user_tasks])
+                self._date_keys[user_id] = cached
+            keys = cached[1]
+
+            day = self.user_day(user_id)
+            start = bisect_left(keys, day.today_iso)
+            end = bisect_left(keys, day.date_after(days), lo=start)
+            return [dict(task) for task in user_tasks[start:end]]
+
+    @_read_locked
+    def get_selectable_tasks(self, user_id: int, limit: int = 25) -> List[Dict]:
+        """Upcoming tasks (not yet started) for the edit/delete picker, soonest first"""
+        now = utc_now()
+        tasks = sorted(
+            [t for t in self._get_user_tasks(user_id) if t['start_utc'] >= now],
+            key=lambda t: t['start_utc']
+        )
+        return [dict(t) for t in tasks[:limit]]
+
+    @_read_locked
     def get_user_task_count(self, user_id: int) -> int:
         """Get the total number of tasks for a user"""
         return len(self._get_user_tasks(user_id))
     
+    @_locked
     def clear_user_tasks(self, user_id: int) -> Dict[str, Any]:
         """Clear all tasks for a user (admin function)"""
         user_tasks = self._get_user_tasks(user_id)
         cleared_count = len(user_tasks)
+        for task in user_tasks:
+            self._task_index.pop(task['id'], None)
         self.tasks[user_id] = []
+        self._trees.pop(user_id, None)
+        self._touch_user(user_id)
         self._save_data()
 
         return {
@@ -0,0 +1,167 @@
+import json
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # e.g. Windows; only shared (multi-process) mode needs it
+
+# Shared stores need cross-process file locks and Unix datagram sockets
+SHARED_MODE_AVAILABLE = fcntl is not None and hasattr(socket, 'AF_UNIX')
+
+
+def require_shared_mode():
+    if not SHARED_MODE_AVAILABLE:
+        raise RuntimeError("Shared schedule stores (several bot processes) need fcntl and Unix sockets, "
+                           "which this platform lacks. Run a single bot process instead.")
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock shared by every process on this machine"""
+    require_shared_mode()
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def file_signature(path: str) -> Optional[tuple]:
+    """Cheap change marker for a file: (inode, size, mtime)"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class IdAllocator:
+    """Globally unique task ids across processes.
+
+    Ids are leased from a shared counter file in blocks, so the file lock is
+    only taken once every `block_size` tasks and ids stay short enough to type.
+    """
+
+    def __init__(self, path: str, block_size: int = 32):
+        self.path = path
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def _read_counter(self) -> int:
+        try:
+            with open(self.path, 'r') as f:
+                return int(f.read().strip() or 1)
+        except FileNotFoundError:
+            return 1
+
+    def _write_counter(self, value: int):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(value))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _lease_block(self):
+        with file_lock(self.path + '.lock'):
+            start = self._read_counter()
+            end = start + self.block_size
+            self._write_counter(end)
+        self._next, self._end = start, end
+
+    def reserve_above(self, task_id: int):
+        """Make sure no id <= task_id is ever handed out (e.g. ids from migrated data)"""
+        with file_lock(self.path + '.lock'):
+            if self._read_counter() <= task_id:
+                self._write_counter(task_id + 1)
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next >= self._end:
+                self._lease_block()
+            task_id = self._next
+            self._next += 1
+            return task_id
+
+
+class InvalidationBus:
+    """Best-effort change notifications between bot processes.
+
+    Every process binds a datagram socket in `run_dir`; after a write, the
+    writer sends {"path", "user"} to all peers so they drop stale partitions.
+    If a peer's queue is full, the writer leaves an overflow marker instead and
+    the peer treats everything as stale. Writers never rely on these messages:
+    they re-check the file under the lock.
+    """
+
+    def __init__(self, run_dir: str, on_message: Callable[[str, int], None],
+                 on_overflow: Callable[[], None]):
+        self.run_dir = run_dir
+        self.on_message = on_message
+        self.on_overflow = on_overflow
+        os.makedirs(run_dir, exist_ok=True)
+        self.address = os.path.join(run_dir, f"{os.getpid()}.sock")
+        self.overflow_path = self.address[:-len('.sock')] + '.overflow'
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.address)
+        self._sock.setblocking(False)
+
+    def publish(self, path: str, user_id: int):
+        payload = json.dumps({"path": os.path.abspath(path), "user": user_id}).encode()
+        for name in os.listdir(self.run_dir):
+            peer = os.path.join(self.run_dir, name)
+            if not name.endswith('.sock') or peer == self.address:
+                continue
+            try:
+                self._sock.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Peer exited without cleaning up
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                # Peer's queue is full: mark the overflow, then retry once so the
+                # peer is woken up after it drains and notices the marker
+                open(peer[:-len('.sock')] + '.overflow', 'a').close()
+                try:
+                    self._sock.sendto(payload, peer)
+                except OSError:
+                    pass
+
+    def poll(self):
+        """Deliver all pending messages without blocking"""
+        while True:
+            try:
+                data = self._sock.recv(4096)
+            except BlockingIOError:
+                break
+            message = json.loads(data)
+            self.on_message(message["path"], message["user"])
+
+        if os.path.exists(self.overflow_path):
+            os.unlink(self.overflow_path)
+            self.on_overflow()
+
+    def attach(self, loop):
+        """Deliver messages from the event loop as they arrive"""
+        loop.add_reader(self._sock.fileno(), self.poll)
+
+    def close(self):
+        self._sock.close()
+        for path in (self.address, self.overflow_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_FORMAT = "schedule-snapshot/1"
+
+
+class SnapshotError(Exception):
+    """No generation of a snapshot could be read back intact"""
+
+
+def generation_paths(path: str, generations: int) -> List[str]:
+    """Newest first: path, path.1, path.2, ..."""
+    return [path] + [f"{path}.{i}" for i in range(1, generations)]
+
+
+def _fsync_dir(path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. platforms that can't open directories
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(path: str, payload: Dict[str, Any], generations: int = 3):
+    """Atomically replace `path`, keeping the previous versions as path.1 .. path.N-1.
+
+    The file is a one-line JSON header (format, length, crc32) followed by the
+    JSON body; the body is written to a temp file and fsynced before the rename,
+    so a crash leaves either the old or the new snapshot, never a truncated one.
+    """
+    body = json.dumps(payload, indent=2).encode()
+    header = json.dumps({
+        "format": SNAPSHOT_FORMAT,
+        "length": len(body),
+        "crc32": zlib.crc32(body),
+        "saved_at": datetime.now().isoformat(),
+    }).encode()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + b"\n" + body)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Rotate older generations down by one, then keep the current file as .1
+    if generations > 1 and os.path.exists(path):
+        older = generation_paths(path, generations)
+        for i in range(len(older) - 1, 1, -1):
+            if os.path.exists(older[i - 1]):
+                os.replace(older[i - 1], older[i])
+        try:
+            if os.path.exists(older[1]):
+                os.unlink(older[1])
+            os.link(path, older[1])
+        except OSError:
+            shutil.copy2(path, older[1])
+
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def _read_one(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    if raw.lstrip().startswith(b'{"format"'):
+        header_line, _, body = raw.partition(b"\n")
+        header = json.loads(header_line)
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"unknown snapshot format {header.get('format')!r}")
+        if len(body) != header["length"] or zlib.crc32(body) != header["crc32"]:
+            raise ValueError("checksum mismatch")
+        return json.loads(body)
+
+    # Plain JSON from before snapshots had a header
+    return json.loads(raw)
+
+
+def read_snapshot(path: str, generations: int = 3) -> Optional[Tuple[Dict[str, Any], str]]:
+    """(data, path it came from) for the newest intact generation, or None if none exist"""
+    found_any = False
+    for candidate in generation_paths(path, generations):
+        if not os.path.exists(candidate):
+            continue
+        found_any = True
+        try:
+            data = _read_one(candidate)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Skipping damaged snapshot {candidate}: {e}")
+            continue
+        if candidate != path:
+            print(f"⚠️ Recovered schedule data from older generation {candidate}")
+        return data, candidate
+
+    if found_any:
+        raise SnapshotError(f"No intact generation of {path} found; refusing to start empty")
+    return None
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from shared_store import file_lock
+from snapshot_store import read_snapshot, write_snapshot
+
+try:
+    from tzlocal import get_localzone_name
+except ImportError:
+    get_localzone_name = None  # fall back to probing TZ and /etc below
+
+
+def _host_timezone() -> str:
+    """IANA name of the machine's local zone, which older tasks were entered in"""
+    candidates = []
+    if get_localzone_name is not None:
+        try:
+            candidates.append(get_localzone_name() or '')
+        except Exception as e:  # tzlocal raises its own errors for unconfigured hosts
+            print(f"⚠️ tzlocal could not read the host time zone: {e}")
+    candidates.append(os.environ.get('TZ', '').lstrip(':'))
+    try:
+        target = os.path.realpath('/etc/localtime')
+        if 'zoneinfo/' in target:
+            candidates.append(target.split('zoneinfo/', 1)[1])
+    except OSError:
+        pass
+    try:
+        with open('/etc/timezone') as f:
+            candidates.append(f.read().strip())
+    except OSError:
+        pass
+
+    for name in candidates:
+        if name:
+            try:
+                return ZoneInfo(name).key
+            except (ZoneInfoNotFoundError, ValueError):
+                continue
+    print("⚠️ Could not determine the host time zone; SCHEDULE_DEFAULT_TZ must be set to the zone "
+          "existing tasks were entered in (e.g. America/Toronto). Falling back to UTC.")
+    return 'UTC'
+
+
+# Zone for users who haven't picked one, and for tasks saved before zones existed
+# (those were entered in the server's local time, so that is the default)
+DEFAULT_TIMEZONE = os.environ.get('SCHEDULE_DEFAULT_TZ') or _host_timezone()
+
+SCHEDULE_WINDOW_DAYS = 5
+PICKER_DAYS = 20
+
+UTC_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def validate_timezone(name: str) -> str:
+    """Canonical IANA zone name, or ValueError"""
+    try:
+        return ZoneInfo(name).key
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{name}'. Use an IANA name like America/Toronto or Europe/London")
+
+
+def local_to_utc(date_str: str, hour: int, minute: int, tz_name: str) -> str:
+    """Wall-clock time in a zone -> sortable UTC timestamp string"""
+    year, month, day = (int(p) for p in date_str.split('-'))
+    local = datetime(year, month, day, hour, minute, tzinfo=ZoneInfo(tz_name))
+    return local.astimezone(timezone.utc).strftime(UTC_FORMAT)
+
+
+def utc_to_local(utc_str: str, tz_name: str) -> Tuple[str, int, int]:
+    """UTC timestamp string -> (YYYY-MM-DD, hour, minute) in a zone"""
+    instant = datetime.strptime(utc_str, UTC_FORMAT).replace(tzinfo=timezone.utc)
+    local = instant.astimezone(ZoneInfo(tz_name))
+    return local.strftime('%Y-%m-%d'), local.hour, local.minute
+
+
+def utc_minutes(utc_str: str) -> int:
+    """UTC timestamp string -> minutes since the epoch"""
+    instant = datetime.strptime(utc_str, UTC_FORMAT).replace(tzinfo=timezone.utc)
+    return int(instant.timestamp()) // 60
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime(UTC_FORMAT)
+
+
+class ZoneDay:
+    """One zone's current calendar day and the windows derived from it"""
+
+    __slots__ = ('tz_name', 'today', 'today_iso', 'window', 'picker_dates', 'expires_at')
+
+    def __init__(self, tz_name: str, today: date, expires_at: float):
+        self.tz_name = tz_name
+        self.today = today
+        self.today_iso = today.isoformat()
+        # (YYYY-MM-DD, "Monday, July 14") for the schedule view
+        self.window: List[Tuple[str, str]] = [
+            ((today + timedelta(days=i)).isoformat(), (today + timedelta(days=i)).strftime('%A, %B %d'))
+            for i in range(SCHEDULE_WINDOW_DAYS)
+        ]
+        self.picker_dates: List[str] = [(today + timedelta(days=i)).isoformat() for i in range(PICKER_DAYS)]
+        self.expires_at = expires_at  # UTC epoch seconds of the zone's next local midnight
+
+    def date_after(self, days: int) -> str:
+        return (self.today + timedelta(days=days)).isoformat()
+
+
+class ZoneCalendar:
+    """Cache of each zone's "today" and window boundaries.
+
+    An entry is rebuilt only once the zone's local midnight has passed, so a
+    render costs one float comparison instead of a datetime.now() round trip.
+    """
+
+    def __init__(self):
+        self._days: Dict[str, ZoneDay] = {}
+
+    def _build(self, tz_name: str) -> ZoneDay:
+        zone = ZoneInfo(tz_name)
+        today = datetime.now(zone).date()
+        next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+        return ZoneDay(tz_name, today, next_midnight.timestamp())
+
+    def day(self, tz_name: str) -> ZoneDay:
+        entry = self._days.get(tz_name)
+        if entry is None or time.time() >= entry.expires_at:
+            entry = self._build(tz_name)
+            self._days[tz_name] = entry  # single assignment: readers see old or new, never partial
+        return entry
+
+
+# Shared by every store and view in the process
+calendar = ZoneCalendar()
+
+
+class UserZones:
+    """Each user's chosen zone, shared by every server's store and saved once.
+
+    Without a path (e.g. a standalone ScheduleManager) the map is in memory only.
+    Writers replace the whole dict, so get() never needs the lock.
+    """
+
+    def __init__(self, path: Optional[str] = None, shared: bool = False,
+                 on_commit: Optional[Callable[[str, int], None]] = None):
+        self.path = path
+        self.shared = shared
+        self.on_commit = on_commit
+        self._zones: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stale = False
+        self._load()
+
+    def _load(self):
+        snapshot = read_snapshot(self.path) if self.path else None
+        if snapshot is not None:
+            self._zones = {int(k): v for k, v in snapshot[0].get("timezones", {}).items()}
+        self._stale = False
+
+    def mark_stale(self):
+        """Another process changed the file; reload before the next read"""
+        self._stale = True
+
+    def get(self, user_id: int) -> str:
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    self._load()
+        return self._zones.get(user_id, DEFAULT_TIMEZONE)
+
+    def set(self, user_id: int, tz_name: str) -> str:
+        """Validate and save a user's zone; returns the canonical name (ValueError if unknown)"""
+        tz_name = validate_timezone(tz_name)
+        self._update({user_id: tz_name})
+        return tz_name
+
+    def adopt(self, zones: Dict[int, str]):
+        """Take zones saved by older per-server stores, for users who have no global choice yet"""
+        missing = {user_id: tz_name for user_id, tz_name in zones.items() if user_id not in self._zones}
+        if missing:
+            self._update(missing, only_missing=True)
+
+    def _update(self, changes: Dict[int, str], only_missing: bool = False):
+        with self._lock:
+            with file_lock(self.path + '.lock') if self.shared else nullcontext():
+                if self.shared:
+                    self._load()
+                applied = [user_id for user_id, tz_name in changes.items()
+                           if self._zones.get(user_id) != tz_name and not (only_missing and user_id in self._zones)]
+                if not applied:
+                    return
+                zones = dict(self._zones)
+                zones.update((user_id, changes[user_id]) for user_id in applied)
+                if self.path:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    write_snapshot(self.path, {"timezones": {str(k): v for k, v in zones.items()}})
+                self._zones = zones
+
+        if self.on_commit is not None:
+            for user_id in applied:
+                self.on_commit(self.path, user_id)
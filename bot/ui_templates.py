@@ -0,0 +1,32 @@
+import discord
+from typing import Dict, List, Tuple
+
+from timezones import calendar
+
+PICKER_HOURS = list(range(7, 24)) + [0]  # 7 AM to 11 PM, plus midnight
+
+
+class ComponentTemplates:
+    """Prebuilt select options for the add-task flow, rebuilt once per day per zone.
+
+    Each zone's options live in a single (day, options) tuple that is replaced
+    wholesale when that zone's local date changes, so readers never see a
+    half-built list.
+    """
+
+    def __init__(self):
+        self._dates: Dict[str, Tuple[str, Tuple[discord.SelectOption, ...]]] = {}
+        self._times: Tuple[discord.SelectOption, ...] = tuple(
+            discord.SelectOption(label=f"{h:02d}:00", value=f"{h:02d}:00") for h in PICKER_HOURS
+        )
+
+    def date_options(self, tz_name: str) -> List[discord.SelectOption]:
+        day = calendar.day(tz_name)
+        snapshot = self._dates.get(tz_name)
+        if snapshot is None or snapshot[0] != day.today_iso:
+            snapshot = (day.today_iso, tuple(discord.SelectOption(label=d, value=d) for d in day.picker_dates))
+            self._dates[tz_name] = snapshot
+        return list(snapshot[1])
+
+    def time_options(self) -> List[discord.SelectOption]:
+        return list(self._times)